@@ -3,11 +3,15 @@ Configuration file for Erlang corpus scraper.
 Contains all constants, settings, and target repositories.
 """
 
+import fnmatch
+import hashlib
 import os
+import re
 from typing import Dict, List, Any
 
 # GitHub API Configuration
 GITHUB_API_BASE = "https://api.github.com"
+GITHUB_GRAPHQL_URL = f"{GITHUB_API_BASE}/graphql"
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")  # Set via environment variable
 REQUESTS_PER_HOUR = 5000 if GITHUB_TOKEN else 60  # Authenticated vs anonymous
 
@@ -21,10 +25,12 @@ REPO_DISCOVERY = {
     "recent_activity_months": 12,  # Active in last 12 months
     "max_repos_per_search": 1000,
     "include_archived": False,
+    "graphql_batch_size": 50,  # Repositories per GraphQL metadata query
+    "primary_erlang_estimate": 0.9,  # Assumed Erlang share of Erlang-primary repos until /languages is fetched
 }
 
 # High-quality seed repositories
-SEED_REPOSITORIES = [
+SEED_REPOSITORIES = (
     # Core Erlang/OTP
     "erlang/otp",
     
@@ -69,7 +75,7 @@ SEED_REPOSITORIES = [
     # Game engines and multimedia
     "jlouis/etorrent",
     "spawngrid/mimetypes",
-]
+)
 
 # GitHub search queries for additional repository discovery
 GITHUB_SEARCH_QUERIES = [
@@ -100,6 +106,11 @@ FILE_PROCESSING = {
     "max_file_size_bytes": 1024 * 1024,  # 1MB max
 }
 
+# Exclude patterns compiled into a single alternation (one match per path)
+EXCLUDE_REGEX = re.compile("|".join(
+    fnmatch.translate(pattern) for pattern in FILE_PROCESSING["exclude_patterns"]
+))
+
 # Function Extraction Settings
 FUNCTION_EXTRACTION = {
     "min_function_lines": 2,
@@ -127,6 +138,12 @@ DOC_PATTERNS = {
     ],
 }
 
+# Documentation patterns compiled once at import, same keys as DOC_PATTERNS
+DOC_PATTERNS_COMPILED = {
+    kind: [re.compile(pattern, re.DOTALL | re.MULTILINE) for pattern in patterns]
+    for kind, patterns in DOC_PATTERNS.items()
+}
+
 # Output Configuration
 OUTPUT_CONFIG = {
     "base_directory": "./output",
@@ -135,6 +152,11 @@ OUTPUT_CONFIG = {
     "stats_file": "stats.json",
     "clone_directory": "./cloned_repos",
     "checkpoint_file": "scraper_checkpoint.json",
+    "checkpoint_log_file": "scraper_checkpoint.jsonl",  # Per-item progress since the last checkpoint
+    "partial_clone_results_file": "clone_results.partial.jsonl",  # Clone results of an unfinished run
+    "http_cache_file": "http_cache.json",        # ETag index for conditional requests
+    "http_cache_directory": "http_cache",        # Cached API response bodies
+    "repo_info_cache_directory": "repo_info_cache",  # Repository metadata keyed by updated_at
     "log_file": "scraper.log",
 }
 
@@ -143,15 +165,57 @@ PROCESSING_LIMITS = {
     "max_repositories": 200,      # Limit total repos to process
     "max_functions_per_repo": 2000,  # Limit functions per repo
     "max_total_functions": 150000,   # Target corpus size
-    "parallel_clone_workers": 4,     # Concurrent git clones
+    "parallel_clone_workers": 12,    # Concurrent git clones (network-bound)
     "parallel_parse_workers": 8,     # Concurrent file parsers
-    "request_delay_seconds": 0.1,    # Delay between API requests
+    "parallel_api_workers": 10,      # Concurrent GitHub API requests
+    "max_concurrent_requests": 20,   # Requests in flight across all discovery threads
+    "max_concurrent_searches": 5,    # Search API requests in flight (separate 30/min budget)
+}
+
+# Repository Cloning
+CLONE_CONFIG = {
+    "checkpoint_every": 50,  # Append finished clone results to the partial results file every N clones
+    "use_clone_cache": True,
+    "cache_directory": "./clone_cache",  # Pristine clones, hardlinked into clone_directory
+    "cache_ttl_hours": 24,               # Older cache entries are refreshed with a shallow fetch
+    # Shared object store clones borrow from (git --reference-if-able), so objects
+    # common to many projects (vendored OTP libraries, rebar3) are stored once
+    "use_reference_repository": False,
+    "reference_repository": "./clone_reference.git",
+    "reference_seed_urls": (
+        "https://github.com/erlang/otp.git",
+        "https://github.com/erlang/rebar3.git",
+    ),
+    # Repositories above this size (GitHub's size_kb) are cloned with --filter=tree:0,
+    # fetching trees lazily at checkout as well, instead of --filter=blob:none
+    "large_repo_kb": 100 * 1024,
+    # Clone github.com over SSH instead of HTTPS (needs an SSH key registered with
+    # GitHub); all git processes then share one multiplexed connection
+    "use_ssh": False,
+    "ssh_control_persist_seconds": 600,
+    # Clone into a tmpfs scratch directory and move the finished clone into place,
+    # so git's many small writes never hit a slow or shared disk. Repositories
+    # that would not fit (twice size_kb plus the reserve) are cloned directly.
+    # /dev/shm is never on the clone directory's filesystem, so with the default
+    # the move is a full copy rather than a rename
+    "use_scratch_directory": False,
+    "scratch_directory": "/dev/shm",
+    "scratch_reserve_mb": 512,
+    # Check out only the files we parse; with a blob:none partial clone the
+    # other blobs (vendored C, docs, images) are never downloaded at all.
+    # Non-cone gitignore-style patterns, since cone mode only matches directories
+    "use_sparse_checkout": True,
+    "sparse_checkout_patterns": (
+        "*.erl", "*.hrl", "*.escript", "*.app.src",
+        "rebar.config", "rebar.lock",
+    ),
 }
 
 # Retry and Error Handling
 ERROR_HANDLING = {
     "max_retries": 3,
-    "retry_delay_seconds": 2,
+    "retry_delay_seconds": 2,       # Base of the exponential backoff (full jitter)
+    "max_retry_delay_seconds": 60,  # Backoff ceiling
     "skip_on_clone_failure": True,
     "skip_on_parse_failure": True,
     "continue_on_api_error": True,
@@ -165,20 +229,44 @@ LOGGING_CONFIG = {
     "file_output": True,
 }
 
+_directories_ensured = False
+
+def ensure_directories():
+    """Create the output and clone directories (only touches the filesystem once)."""
+    global _directories_ensured
+    if _directories_ensured:
+        return
+    os.makedirs(OUTPUT_CONFIG["base_directory"], exist_ok=True)
+    os.makedirs(OUTPUT_CONFIG["clone_directory"], exist_ok=True)
+    if CLONE_CONFIG["use_clone_cache"]:
+        os.makedirs(CLONE_CONFIG["cache_directory"], exist_ok=True)
+    _directories_ensured = True
+
 def get_output_path(filename: str) -> str:
     """Get full path for output file."""
-    base_dir = OUTPUT_CONFIG["base_directory"]
-    os.makedirs(base_dir, exist_ok=True)
-    return os.path.join(base_dir, filename)
+    ensure_directories()
+    return os.path.join(OUTPUT_CONFIG["base_directory"], filename)
 
 def get_clone_path(repo_name: str) -> str:
     """Get full path for cloned repository."""
+    ensure_directories()
     clone_dir = OUTPUT_CONFIG["clone_directory"]
-    os.makedirs(clone_dir, exist_ok=True)
     # Replace / with _ for filesystem compatibility
     safe_name = repo_name.replace("/", "_")
     return os.path.join(clone_dir, safe_name)
 
+def get_clone_cache_path(clone_url: str) -> str:
+    """Get the clone cache entry for a repository URL."""
+    ensure_directories()
+    key = hashlib.sha256(clone_url.encode("utf-8")).hexdigest()
+    return os.path.join(CLONE_CONFIG["cache_directory"], key)
+
+def is_excluded(path: str) -> bool:
+    """Check whether a file path matches any FILE_PROCESSING exclude pattern."""
+    if os.sep != "/":
+        path = path.replace(os.sep, "/")
+    return EXCLUDE_REGEX.match(path) is not None
+
 def validate_config() -> bool:
     """Validate configuration settings."""
     if not GITHUB_TOKEN:
@@ -5,74 +5,161 @@ Coordinates repository discovery, cloning, and preparation for function extracti
 """
 
 import argparse
+import atexit
 import logging
-import json
+import logging.handlers
 import os
+import queue
+import signal
 import sys
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Optional
+from heapq import nlargest
+from itertools import islice
+from operator import attrgetter
+from typing import List, Optional, Tuple
+
+import numpy as np
 
 # Import our modules
 from config import (
-    LOGGING_CONFIG, OUTPUT_CONFIG, PROCESSING_LIMITS,
-    get_output_path, validate_config
+    GITHUB_TOKEN, LOGGING_CONFIG, OUTPUT_CONFIG, PROCESSING_LIMITS,
+    ensure_directories, get_output_path, validate_config
 )
 from scrapers.github_discovery import GitHubDiscovery, RepositoryInfo
 from scrapers.repo_cloner import RepositoryCloner, CloneResult
 from utils.rate_limiter import create_github_rate_limiter
+from utils import jsonio, msgpackio
+from utils.batcher import CheckpointBatcher
+
+class BufferedFileHandler(logging.FileHandler):
+    """
+    File handler that writes through a large buffer instead of flushing per record.
+    
+    Records at ERROR and above still flush immediately so failures are on disk
+    even if the process dies; everything else is flushed when the buffer fills
+    or when logging shuts down at exit.
+    """
+    
+    buffer_size = 1 << 16
+    
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size,
+                    encoding=self.encoding, errors=self.errors)
+    
+    def emit(self, record: logging.LogRecord):
+        super().emit(record)
+        if record.levelno >= logging.ERROR:
+            super().flush()
+    
+    def flush(self):
+        # Called by StreamHandler.emit after every record; leave it to the buffer
+        pass
+    
+    def close(self):
+        self.acquire()
+        try:
+            if self.stream:
+                super().flush()
+        finally:
+            self.release()
+        super().close()
 
 def setup_logging(log_level: str = "INFO", log_to_file: bool = True):
-    """Set up logging configuration."""
+    """
+    Set up logging configuration.
+    
+    Records are handed to a QueueListener thread that owns the console and
+    file handlers, so worker threads never block on terminal or disk IO.
+    """
     log_format = LOGGING_CONFIG["format"]
     level = getattr(logging, log_level.upper())
-    
-    # Configure root logger
-    logging.basicConfig(
-        level=level,
-        format=log_format,
-        handlers=[]
-    )
-    
-    logger = logging.getLogger()
+    formatter = logging.Formatter(log_format)
+    handlers = []
+    log_file = None
     
     # Console handler
     if LOGGING_CONFIG["console_output"]:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(level)
-        console_formatter = logging.Formatter(log_format)
-        console_handler.setFormatter(console_formatter)
-        logger.addHandler(console_handler)
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
     
-    # File handler
+    # File handler (buffered, flushed once at exit by logging's own atexit hook)
     if log_to_file and LOGGING_CONFIG["file_output"]:
         log_file = get_output_path(OUTPUT_CONFIG["log_file"])
-        file_handler = logging.FileHandler(log_file, mode='a', encoding='utf-8')
+        file_handler = BufferedFileHandler(log_file, mode='a', encoding='utf-8')
         file_handler.setLevel(level)
-        file_formatter = logging.Formatter(log_format)
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
-        
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    
+    # Route everything through a queue drained by a single background thread.
+    # The queue handler only merges message arguments; the real handlers format.
+    log_queue = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    
+    # Configure root logger
+    logging.basicConfig(level=level, handlers=[queue_handler])
+    logger = logging.getLogger()
+    
+    listener.start()
+    # Runs before logging.shutdown (atexit is LIFO), so the queue is drained first
+    atexit.register(listener.stop)
+    
+    if log_file:
         logger.info(f"Logging to file: {log_file}")
     
     return logger
 
 def load_repositories_from_file(filename: str) -> Optional[List[RepositoryInfo]]:
-    """Load previously discovered repositories from JSON file."""
+    """Load previously discovered repositories, preferring the msgpack copy of the JSON file."""
+    if msgpackio.is_fresh(filename):
+        binary_file = msgpackio.binary_path(filename)
+        try:
+            data = msgpackio.load(binary_file)
+            return [RepositoryInfo(**repo_data) for repo_data in data["repositories"]]
+        except (ValueError, KeyError, TypeError) as e:
+            logging.getLogger(__name__).warning(f"Could not load repositories from {binary_file}: {e}")
+    
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            
-        repositories = []
-        for repo_data in data.get("repositories", []):
-            repositories.append(RepositoryInfo(**repo_data))
-            
-        return repositories
-    except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
+        # Stream the list so only one record is parsed into memory at a time
+        return [RepositoryInfo(**repo_data)
+                for repo_data in jsonio.iter_items(filename, "repositories.item")]
+    except (FileNotFoundError, jsonio.StreamError, KeyError, TypeError) as e:
         logging.getLogger(__name__).warning(f"Could not load repositories from {filename}: {e}")
         return None
 
+def rank_by_quality(repositories: List[RepositoryInfo], limit: Optional[int] = None) -> List[RepositoryInfo]:
+    """
+    Order repositories by descending quality score, optionally keeping the top N.
+    
+    Discovery saves repositories already in this order, so the common case is a
+    linear check and a slice; otherwise heapq.nlargest picks the top N.
+    
+    Args:
+        repositories: Repositories to rank
+        limit: Maximum number of repositories to return (None for all)
+        
+    Returns:
+        Repositories ordered by quality score, highest first
+    """
+    scores = [repo.quality_score for repo in repositories]
+    if all(a >= b for a, b in zip(scores, islice(scores, 1, None))):
+        return repositories[:limit] if limit is not None else repositories
+    
+    return nlargest(limit if limit is not None else len(repositories),
+                    repositories, key=attrgetter("quality_score"))
+
 def save_checkpoint(stage: str, data: dict):
-    """Save checkpoint for resumability."""
+    """
+    Save checkpoint for resumability.
+    
+    The checkpoint is written atomically and supersedes any per-item progress
+    appended since the previous one, so the progress log is reset.
+    """
     checkpoint_file = get_output_path(OUTPUT_CONFIG["checkpoint_file"])
     
     checkpoint = {
@@ -81,23 +168,63 @@ def save_checkpoint(stage: str, data: dict):
         "data": data
     }
     
-    with open(checkpoint_file, 'w', encoding='utf-8') as f:
-        json.dump(checkpoint, f, indent=2)
+    jsonio.dump(checkpoint, checkpoint_file, atomic=True)
+    
+    try:
+        os.remove(get_output_path(OUTPUT_CONFIG["checkpoint_log_file"]))
+    except FileNotFoundError:
+        pass
     
     logging.getLogger(__name__).info(f"Checkpoint saved: {stage}")
 
+def append_checkpoint(stage: str, delta: dict):
+    """Append one progress record to the checkpoint log without rewriting the checkpoint."""
+    jsonio.append_line({
+        "timestamp": datetime.now().isoformat(),
+        "stage": stage,
+        "data": delta
+    }, get_output_path(OUTPUT_CONFIG["checkpoint_log_file"]))
+
 def load_checkpoint() -> Optional[dict]:
-    """Load checkpoint for resuming."""
+    """
+    Load checkpoint for resuming.
+    
+    Progress records appended after the last checkpoint are replayed on top of
+    it: they are collected under "progress" and the latest one sets the stage.
+    """
     checkpoint_file = get_output_path(OUTPUT_CONFIG["checkpoint_file"])
+    checkpoint_log_file = get_output_path(OUTPUT_CONFIG["checkpoint_log_file"])
     
     try:
-        with open(checkpoint_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return None
+        checkpoint = jsonio.load(checkpoint_file)
+    except (FileNotFoundError, jsonio.JSONDecodeError):
+        checkpoint = None
+    
+    try:
+        progress = list(jsonio.iter_lines(checkpoint_log_file))
+    except FileNotFoundError:
+        progress = []
+    
+    if progress:
+        checkpoint = checkpoint or {"data": {}}
+        checkpoint["stage"] = progress[-1]["stage"]
+        checkpoint["timestamp"] = progress[-1]["timestamp"]
+        checkpoint["progress"] = [record["data"] for record in progress]
+    
+    return checkpoint
 
-def discover_repositories(args) -> List[RepositoryInfo]:
-    """Discover repositories using GitHub API."""
+def discover_repositories(args, discovery: Optional[GitHubDiscovery] = None
+                          ) -> Tuple[List[RepositoryInfo], Optional[Future]]:
+    """
+    Discover repositories using GitHub API.
+    
+    Newly discovered repositories are written to disk on a background thread
+    so the next phase can start while the (possibly large) file is written.
+    
+    Returns:
+        Tuple of (repositories, future that completes once the repositories
+        file and discovery checkpoint are written, or None if loaded from file)
+    """
     logger = logging.getLogger(__name__)
     
     # Check if we should load from existing file
@@ -107,34 +234,50 @@ def discover_repositories(args) -> List[RepositoryInfo]:
         repositories = load_repositories_from_file(repo_file)
         if repositories:
             logger.info(f"Loaded {len(repositories)} repositories from file")
-            return repositories
+            return repositories, None
         else:
             logger.warning("Failed to load repositories from file, discovering new ones")
     
     # Discover new repositories
     logger.info("Starting repository discovery")
-    discovery = GitHubDiscovery()
+    if discovery is None:
+        discovery = GitHubDiscovery(fresh=args.fresh)
     
     try:
         repositories = discovery.discover_all_repositories()
         
-        # Save discovered repositories
-        discovery.save_repositories(repositories, repo_file)
+        def save_discovery():
+            # Save discovered repositories
+            discovery.save_repositories(repositories, repo_file, pretty=args.pretty)
+            
+            # Save checkpoint
+            save_checkpoint("discovery_complete", {
+                "repositories_found": len(repositories),
+                "repositories_file": repo_file
+            })
         
-        # Save checkpoint
-        save_checkpoint("discovery_complete", {
-            "repositories_found": len(repositories),
-            "repositories_file": repo_file
-        })
+        # The worker thread finishes the write and exits; interpreter exit waits for it
+        writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="discovery-writer")
+        saved = writer.submit(save_discovery)
+        writer.shutdown(wait=False)
         
-        return repositories
+        return repositories, saved
         
     except Exception as e:
         logger.error(f"Repository discovery failed: {e}")
         raise
 
-def clone_repositories(repositories: List[RepositoryInfo], args) -> List[CloneResult]:
-    """Clone discovered repositories."""
+def clone_repositories(repositories: List[RepositoryInfo], args,
+                       discovery_saved: Optional[Future] = None) -> List[CloneResult]:
+    """
+    Clone discovered repositories.
+    
+    Args:
+        repositories: Repositories to clone
+        args: Parsed command line arguments
+        discovery_saved: Pending discovery write (see discover_repositories);
+            checkpoint writes wait for it so they land after the discovery checkpoint
+    """
     logger = logging.getLogger(__name__)
     
     logger.info(f"Starting to clone {len(repositories)} repositories")
@@ -142,16 +285,42 @@ def clone_repositories(repositories: List[RepositoryInfo], args) -> List[CloneRe
     # Limit repositories if specified
     if args.max_repos and len(repositories) > args.max_repos:
         logger.info(f"Limiting to {args.max_repos} repositories (sorted by quality)")
-        repositories = sorted(repositories, key=lambda r: r.quality_score, reverse=True)[:args.max_repos]
+        repositories = rank_by_quality(repositories, args.max_repos)
     
     cloner = RepositoryCloner(max_workers=args.clone_workers)
     
+    def wait_for_discovery_save():
+        if discovery_saved is not None:
+            discovery_saved.result()
+    
+    def append_progress(stage: str, delta: dict):
+        # The discovery checkpoint would otherwise reset the log after this record
+        wait_for_discovery_save()
+        append_checkpoint(stage, delta)
+    
+    # Per-repository progress is coalesced into at most one checkpoint log line per second
+    batcher = CheckpointBatcher(append_progress)
+    
     try:
-        results = cloner.clone_repositories(repositories, force_reclone=args.force_reclone)
+        try:
+            results = cloner.clone_repositories(
+                repositories, force_reclone=args.force_reclone,
+                progress_callback=lambda result: batcher.update("cloning", {
+                    result.repo_info.full_name: {
+                        "success": result.success,
+                        "local_path": result.local_path
+                    }
+                })
+            )
+        finally:
+            # Drain pending progress before the full checkpoint resets the log
+            batcher.close()
+        
+        wait_for_discovery_save()
         
         # Save clone results
         results_file = get_output_path("clone_results.json")
-        cloner.save_clone_results(results, results_file)
+        cloner.save_clone_results(results, results_file, pretty=args.pretty)
         
         # Save checkpoint
         successful_clones = len([r for r in results if r.success])
@@ -172,29 +341,46 @@ def generate_corpus_stats(repositories: List[RepositoryInfo], clone_results: Lis
     """Generate and save corpus statistics."""
     logger = logging.getLogger(__name__)
     
-    successful_clones = [r for r in clone_results if r.success]
+    repo_count = len(repositories)
+    clone_count = len(clone_results)
+    
+    # Pull the numeric columns into arrays once and aggregate them in NumPy
+    quality_scores = np.fromiter((r.quality_score for r in repositories), dtype=np.float64, count=repo_count)
+    stars = np.fromiter((r.stars for r in repositories), dtype=np.int64, count=repo_count)
+    languages_distribution = dict(Counter(r.language or "Unknown" for r in repositories))
+    
+    clone_success = np.fromiter((r.success for r in clone_results), dtype=bool, count=clone_count)
+    clone_sizes_mb = np.fromiter((r.size_mb for r in clone_results), dtype=np.float64, count=clone_count)
+    clone_times = np.fromiter((r.clone_time_seconds for r in clone_results), dtype=np.float64, count=clone_count)
+    
+    successful_clones = int(clone_success.sum())
+    total_size_mb = float(clone_sizes_mb[clone_success].sum())
+    total_clone_time = float(clone_times.sum())
+    
+    # Hash lookup for the repository/clone result join below (O(N+M), not O(N*M))
+    cloned_ok = frozenset(r.repo_info.full_name for r in clone_results if r.success)
     
     stats = {
         "generation_date": datetime.now().isoformat(),
         "discovery_stats": {
-            "total_repositories_discovered": len(repositories),
-            "average_quality_score": sum(r.quality_score for r in repositories) / len(repositories),
-            "top_quality_score": max(r.quality_score for r in repositories),
-            "languages_distribution": {},
+            "total_repositories_discovered": repo_count,
+            "average_quality_score": float(quality_scores.mean()) if repo_count else 0,
+            "top_quality_score": float(quality_scores.max()) if repo_count else 0,
+            "languages_distribution": languages_distribution,
             "stars_distribution": {
-                "min": min(r.stars for r in repositories),
-                "max": max(r.stars for r in repositories),
-                "average": sum(r.stars for r in repositories) / len(repositories)
+                "min": int(stars.min()) if repo_count else 0,
+                "max": int(stars.max()) if repo_count else 0,
+                "average": float(stars.mean()) if repo_count else 0
             }
         },
         "clone_stats": {
-            "total_attempted": len(clone_results),
-            "successful_clones": len(successful_clones),
-            "failed_clones": len(clone_results) - len(successful_clones),
-            "success_rate": len(successful_clones) / len(clone_results),
-            "total_size_mb": sum(r.size_mb for r in successful_clones),
-            "average_size_mb": sum(r.size_mb for r in successful_clones) / len(successful_clones) if successful_clones else 0,
-            "total_clone_time": sum(r.clone_time_seconds for r in clone_results),
+            "total_attempted": clone_count,
+            "successful_clones": successful_clones,
+            "failed_clones": clone_count - successful_clones,
+            "success_rate": successful_clones / clone_count if clone_count else 0,
+            "total_size_mb": total_size_mb,
+            "average_size_mb": total_size_mb / successful_clones if successful_clones else 0,
+            "total_clone_time": total_clone_time,
         },
         "repository_list": [
             {
@@ -202,22 +388,15 @@ def generate_corpus_stats(repositories: List[RepositoryInfo], clone_results: Lis
                 "stars": repo.stars,
                 "quality_score": repo.quality_score,
                 "erlang_percentage": repo.erlang_percentage,
-                "cloned_successfully": any(r.success and r.repo_info.full_name == repo.full_name for r in clone_results)
+                "cloned_successfully": repo.full_name in cloned_ok
             }
-            for repo in sorted(repositories, key=lambda r: r.quality_score, reverse=True)
+            for repo in rank_by_quality(repositories)
         ]
     }
     
-    # Calculate language distribution
-    for repo in repositories:
-        main_lang = repo.language or "Unknown"
-        stats["discovery_stats"]["languages_distribution"][main_lang] = \
-            stats["discovery_stats"]["languages_distribution"].get(main_lang, 0) + 1
-    
-    # Save stats
+    # Save stats (compact, this file is meant for machines)
     stats_file = get_output_path(OUTPUT_CONFIG["stats_file"])
-    with open(stats_file, 'w', encoding='utf-8') as f:
-        json.dump(stats, f, indent=2, ensure_ascii=False)
+    jsonio.dump(stats, stats_file, indent=False)
     
     logger.info(f"Corpus statistics saved to {stats_file}")
     
@@ -225,10 +404,10 @@ def generate_corpus_stats(repositories: List[RepositoryInfo], clone_results: Lis
     logger.info("=" * 60)
     logger.info("CORPUS GENERATION SUMMARY")
     logger.info("=" * 60)
-    logger.info(f"Repositories discovered: {len(repositories)}")
-    logger.info(f"Repositories cloned: {len(successful_clones)}/{len(clone_results)}")
-    logger.info(f"Success rate: {len(successful_clones)/len(clone_results)*100:.1f}%")
-    logger.info(f"Total corpus size: {sum(r.size_mb for r in successful_clones):.1f} MB")
+    logger.info(f"Repositories discovered: {repo_count}")
+    logger.info(f"Repositories cloned: {successful_clones}/{clone_count}")
+    logger.info(f"Success rate: {stats['clone_stats']['success_rate']*100:.1f}%")
+    logger.info(f"Total corpus size: {total_size_mb:.1f} MB")
     logger.info(f"Average repository quality: {stats['discovery_stats']['average_quality_score']:.1f}/100")
 
 def main():
@@ -258,9 +437,12 @@ Examples:
     
     # Force options
     parser.add_argument("--force-discovery", action="store_true",
-                       help="Force rediscovery even if repositories.json exists")
+                       help="Force rediscovery even if repositories.json exists "
+                            "(unchanged API responses are reused from the HTTP cache)")
+    parser.add_argument("--fresh", action="store_true",
+                       help="Ignore cached repository metadata and query GitHub for every repository")
     parser.add_argument("--force-reclone", action="store_true",
-                       help="Force recloning even if repository already exists")
+                       help="Refresh existing clones to the latest commit (recloning if that fails)")
     
     # Limits and controls
     parser.add_argument("--max-repos", type=int, metavar="N",
@@ -269,6 +451,10 @@ Examples:
                        default=PROCESSING_LIMITS["parallel_clone_workers"],
                        help="Number of parallel clone workers")
     
+    # Output
+    parser.add_argument("--pretty", action="store_true",
+                       help="Indent records in repositories.json (for debugging)")
+    
     # Logging
     parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
                        default="INFO", help="Logging level")
@@ -291,6 +477,9 @@ Examples:
     if args.clone_only and args.discover:
         parser.error("Cannot use --clone-only with --discover")
     
+    # Create output directories once up front
+    ensure_directories()
+    
     # Set up logging
     logger = setup_logging(args.log_level, not args.no_file_log)
     
@@ -308,6 +497,20 @@ Examples:
     try:
         repositories = []
         clone_results = []
+        discovery_saved = None
+        
+        # Check the API budget up front so the rate limiter starts from GitHub's numbers
+        discovery = None
+        if args.discover or args.discover_only:
+            discovery = GitHubDiscovery(rate_limiter=create_github_rate_limiter(bool(GITHUB_TOKEN)),
+                                        fresh=args.fresh)
+            discovery.check_rate_limit()
+            
+            # Ctrl-C interrupts only the main thread; also wake workers sleeping in the limiter
+            def interrupt(signum, frame):
+                discovery.rate_limiter.cancel()
+                signal.default_int_handler(signum, frame)
+            signal.signal(signal.SIGINT, interrupt)
         
         # Handle resume functionality
         if args.resume:
@@ -321,7 +524,7 @@ Examples:
         # Discovery phase
         if args.discover or args.discover_only:
             logger.info("Phase 1: Repository Discovery")
-            repositories = discover_repositories(args)
+            repositories, discovery_saved = discover_repositories(args, discovery)
             logger.info(f"Discovery complete: {len(repositories)} repositories found")
         
         # Clone phase
@@ -335,11 +538,21 @@ Examples:
                 if not repositories:
                     logger.error("No repositories found. Run discovery first.")
                     return 1
+                
+                # A saved list may be stale; dropping dead repositories takes one GraphQL
+                # query per batch instead of a failing clone each
+                if GITHUB_TOKEN:
+                    discovery = discovery or GitHubDiscovery(rate_limiter=create_github_rate_limiter(True))
+                    repositories = discovery.prevalidate_repositories(repositories)
             
-            clone_results = clone_repositories(repositories, args)
+            clone_results = clone_repositories(repositories, args, discovery_saved)
             successful_clones = len([r for r in clone_results if r.success])
             logger.info(f"Cloning complete: {successful_clones}/{len(clone_results)} repositories cloned")
         
+        # Wait for the discovery output to reach disk (re-raises any write error)
+        if discovery_saved is not None:
+            discovery_saved.result()
+        
         # Generate final statistics
         if repositories and (clone_results or args.discover_only):
             generate_corpus_stats(repositories, clone_results)
@@ -4,26 +4,46 @@ Discovers high-quality Erlang repositories using GitHub API.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import json
 import logging
-from typing import List, Dict, Optional, Set
+from contextlib import nullcontext
+from typing import Any, List, Dict, Optional, Set, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields, replace
+from functools import lru_cache
+from operator import attrgetter, itemgetter
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from threading import BoundedSemaphore
+
+import numpy as np
 
 # Import our config (assumes config.py is in parent directory)
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import (
-    GITHUB_API_BASE, GITHUB_TOKEN, REQUESTS_PER_HOUR,
+    GITHUB_API_BASE, GITHUB_GRAPHQL_URL, GITHUB_TOKEN,
     REPO_DISCOVERY, SEED_REPOSITORIES, GITHUB_SEARCH_QUERIES,
     PROCESSING_LIMITS, ERROR_HANDLING, get_output_path
 )
+from utils.rate_limiter import GitHubRateLimiter, RateLimiterCancelled, create_github_rate_limiter
+from utils.http_cache import HTTPCache
+from utils.repo_info_cache import RepositoryInfoCache
+from utils import jsonio, msgpackio
 
-@dataclass
+@dataclass(frozen=True)
 class RepositoryInfo:
-    """Repository information structure."""
+    """Repository information structure (immutable; hashed by full_name)."""
+    __slots__ = (
+        "name", "full_name", "description", "stars", "forks", "size_kb",
+        "language", "languages", "created_at", "updated_at", "clone_url",
+        "html_url", "archived", "has_wiki", "has_issues", "erlang_percentage",
+        "quality_score",
+    )
+    
     name: str
     full_name: str
     description: str
@@ -41,17 +61,107 @@ class RepositoryInfo:
     has_issues: bool
     erlang_percentage: float
     quality_score: float
+    
+    def __hash__(self):
+        # languages is a dict, so hash on the identifying field only
+        return hash(self.full_name)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Field values as a plain dict (shallow; languages is shared, not copied)."""
+        return dict(zip(REPOSITORY_INFO_FIELDS, REPOSITORY_INFO_VALUES(self)))
+    
+    # Frozen slotted instances need explicit pickle support (setattr is blocked)
+    def __getstate__(self):
+        return REPOSITORY_INFO_VALUES(self)
+    
+    def __setstate__(self, state):
+        for name, value in zip(REPOSITORY_INFO_FIELDS, state):
+            object.__setattr__(self, name, value)
+
+# Field names in declaration order, and a getter returning their values as a tuple
+REPOSITORY_INFO_FIELDS = tuple(f.name for f in fields(RepositoryInfo))
+REPOSITORY_INFO_VALUES = attrgetter(*REPOSITORY_INFO_FIELDS)
+# GitHubDiscovery._with_scores builds scored copies positionally
+assert REPOSITORY_INFO_FIELDS[-1] == "quality_score", "quality_score must be RepositoryInfo's last field"
+
+# REST repository fields RepositoryInfo requires, fetched in one C-level pass
+_REPO_REQUIRED_KEYS = (
+    "name", "full_name", "stargazers_count", "forks_count", "size",
+    "created_at", "updated_at", "clone_url", "html_url",
+)
+_REPO_REQUIRED = itemgetter(*_REPO_REQUIRED_KEYS)
+# Optional REST repository fields and their defaults
+_REPO_OPTIONAL = {
+    "description": "",
+    "language": "",
+    "archived": False,
+    "has_wiki": False,
+    "has_issues": False,
+}
+
+@lru_cache(maxsize=8192)
+def _parse_iso(timestamp: str) -> datetime:
+    """Parse a GitHub ISO 8601 timestamp ("...Z") into an aware datetime."""
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+
+def _repo_api_url(full_name: str, suffix: str = "") -> str:
+    """
+    REST URL for a repository.
+    
+    GitHub names are case-insensitive, so the name is lowercased to give every
+    repository a single HTTP cache entry however it was spelled.
+    """
+    return f"{GITHUB_API_BASE}/repos/{full_name.lower()}{suffix}"
 
 class GitHubAPIError(Exception):
     """Custom exception for GitHub API errors."""
     pass
 
+# Repository fields requested per alias in batched GraphQL queries
+GRAPHQL_REPOSITORY_FIELDS = """
+    name
+    nameWithOwner
+    description
+    stargazerCount
+    forkCount
+    diskUsage
+    primaryLanguage { name }
+    languages(first: 20, orderBy: {field: SIZE, direction: DESC}) {
+        edges { size node { name } }
+    }
+    createdAt
+    updatedAt
+    url
+    isArchived
+    isFork
+    hasWikiEnabled
+    hasIssuesEnabled
+"""
+
 class GitHubDiscovery:
     """Discovers Erlang repositories using GitHub API."""
     
-    def __init__(self):
+    def __init__(self, rate_limiter: Optional[GitHubRateLimiter] = None, max_workers: int = None,
+                 http_cache: Optional[HTTPCache] = None, repo_info_cache: Optional[RepositoryInfoCache] = None,
+                 fresh: bool = False):
         self.session = requests.Session()
         self.logger = logging.getLogger(__name__)
+        self.max_workers = max_workers or PROCESSING_LIMITS["parallel_api_workers"]
+        
+        # Keep-alive pool sized for the request bound below; urllib3 retries
+        # connection errors and 5xx with exponential backoff. Rate limit
+        # responses (403/429) are left to _request so the limiter sees them.
+        retry = Retry(
+            total=ERROR_HANDLING["max_retries"],
+            backoff_factor=ERROR_HANDLING["retry_delay_seconds"],
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=["GET", "POST"],  # POSTs are read-only GraphQL queries
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        pool_size = PROCESSING_LIMITS["max_concurrent_requests"]
+        self.session.mount("https://", HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                                                   max_retries=retry))
         
         # Set up authentication if token is available
         if GITHUB_TOKEN:
@@ -63,119 +173,532 @@ class GitHubDiscovery:
         else:
             self.logger.warning("No GitHub token - rate limits will be restrictive")
             
-        # Rate limiting
-        self.requests_made = 0
-        self.hour_start = time.time()
-        
-    def _rate_limit_check(self):
-        """Check and enforce rate limiting."""
-        current_time = time.time()
-        
-        # Reset counter every hour
-        if current_time - self.hour_start > 3600:
-            self.requests_made = 0
-            self.hour_start = current_time
+        # Bound on requests in flight, shared by every thread using this instance
+        self.request_slots = BoundedSemaphore(PROCESSING_LIMITS["max_concurrent_requests"])
+        # Tighter bound for the search API, which has its own small per-minute budget
+        self.search_slots = BoundedSemaphore(PROCESSING_LIMITS["max_concurrent_searches"])
+        
+        # Rate limiting (thread-safe, shared by all concurrent requests)
+        self.rate_limiter = rate_limiter or create_github_rate_limiter(bool(GITHUB_TOKEN))
+        
+        # Conditional request cache (304 responses don't count against the rate limit)
+        self.http_cache = http_cache or HTTPCache()
+        
+        # Repository metadata cache, validated against updated_at from search results.
+        # With fresh=True cached entries are never read (but still refreshed).
+        self.repo_info_cache = repo_info_cache or RepositoryInfoCache()
+        self.fresh = fresh
+    
+    def _request(self, method: str, url: str, search: bool = False, **kwargs) -> requests.Response:
+        """
+        Send a rate-limited request to the GitHub API, waiting out rate limit rejections.
+        
+        Args:
+            method: HTTP method
+            url: Request URL
+            search: True for search API requests, which have a separate limit
+            **kwargs: Passed through to requests.Session.request
             
-        # Check if we're approaching rate limit
-        if self.requests_made >= REQUESTS_PER_HOUR * 0.9:  # 90% of limit
-            sleep_time = 3600 - (current_time - self.hour_start)
-            if sleep_time > 0:
-                self.logger.warning(f"Rate limit approaching, sleeping for {sleep_time:.0f} seconds")
-                time.sleep(sleep_time)
-                self.requests_made = 0
-                self.hour_start = time.time()
-    
-    def _make_request(self, url: str, params: Optional[Dict] = None) -> Dict:
-        """Make rate-limited request to GitHub API."""
-        self._rate_limit_check()
+        Returns:
+            The final response (any status other than a rate limit rejection)
+        """
+        # GitHub budgets core, search and GraphQL requests separately
+        if search:
+            resource = "search"
+        elif url == GITHUB_GRAPHQL_URL:
+            resource = "graphql"
+        else:
+            resource = "core"
         
         for attempt in range(ERROR_HANDLING["max_retries"]):
+            # The ticket waits for a slot on entry and records the response headers on exit
             try:
-                response = self.session.get(url, params=params)
-                self.requests_made += 1
-                
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code == 403:
-                    # Rate limit exceeded
-                    reset_time = int(response.headers.get('X-RateLimit-Reset', 0))
-                    sleep_time = max(reset_time - int(time.time()), 60)
-                    self.logger.warning(f"Rate limit exceeded, sleeping for {sleep_time} seconds")
-                    time.sleep(sleep_time)
-                    continue
-                elif response.status_code == 404:
-                    self.logger.warning(f"Repository not found: {url}")
-                    return {}
-                else:
-                    response.raise_for_status()
-                    
-            except requests.RequestException as e:
-                self.logger.error(f"Request failed (attempt {attempt + 1}): {e}")
-                if attempt < ERROR_HANDLING["max_retries"] - 1:
-                    time.sleep(ERROR_HANDLING["retry_delay_seconds"] * (attempt + 1))
-                else:
-                    raise GitHubAPIError(f"Failed to fetch {url} after {ERROR_HANDLING['max_retries']} attempts")
-                    
-        return {}
+                with self.rate_limiter.acquire(resource) as ticket:
+                    try:
+                        with (self.search_slots if search else nullcontext()), self.request_slots:
+                            response = self.session.request(method, url, **kwargs)
+                    except requests.RequestException as e:
+                        # Transient failures were already retried by the adapter
+                        raise GitHubAPIError(f"Failed to fetch {url}: {e}")
+                    ticket.response = response
+            except RateLimiterCancelled:
+                raise GitHubAPIError(f"Rate limiter cancelled before fetching {url}")
+            
+            rate_limited = response.status_code == 429 or (
+                response.status_code == 403 and response.headers.get('X-RateLimit-Remaining') == '0'
+            )
+            if rate_limited:
+                # Rate limit exceeded
+                reset_time = int(response.headers.get('X-RateLimit-Reset', 0))
+                sleep_time = max(reset_time - int(time.time()), 60)
+                self.logger.warning(f"Rate limit exceeded, sleeping for {sleep_time} seconds")
+                self.rate_limiter.handle_429_response()
+                if not self.rate_limiter.sleep(sleep_time):
+                    raise GitHubAPIError(f"Rate limiter cancelled while waiting to retry {url}")
+                continue
+            
+            self.rate_limiter.handle_success_response()
+            return response
+        
+        raise GitHubAPIError(f"Rate limited on {url} after {ERROR_HANDLING['max_retries']} attempts")
+    
+    def check_rate_limit(self) -> Optional[Dict]:
+        """
+        Query /rate_limit (which does not count against the budget) and
+        seed the rate limiter with the current remaining requests.
+        
+        Returns:
+            The "resources" object of the response, or None on failure
+        """
+        try:
+            response = self.session.get(f"{GITHUB_API_BASE}/rate_limit")
+            response.raise_for_status()
+            resources = response.json()["resources"]
+        except (requests.RequestException, ValueError, KeyError) as e:
+            self.logger.warning(f"Could not query GitHub rate limit: {e}")
+            return None
+        
+        self.rate_limiter.update_from_rate_limit(resources)
+        return resources
+    
+    def _make_request(self, url: str, params: Optional[Dict] = None, search: bool = False) -> Dict:
+        """Make rate-limited conditional request to GitHub API."""
+        body, _ = self._make_conditional_request(url, params, search)
+        return body
+    
+    def _make_conditional_request(self, url: str, params: Optional[Dict] = None,
+                                  search: bool = False) -> Tuple[Dict, bool]:
+        """
+        Make rate-limited conditional request to GitHub API.
+        
+        Returns:
+            Tuple of (response body, True if GitHub answered 304 Not Modified)
+        """
+        cache_key = HTTPCache.cache_key(url, params)
+        etag = self.http_cache.get_etag(cache_key)
+        headers = {"If-None-Match": etag} if etag else None
+        
+        response = self._request("GET", url, search=search, params=params, headers=headers)
+        
+        if response.status_code == 304:
+            body = self.http_cache.load_body(cache_key)
+            if body is not None:
+                return body, True
+            # Cached body is gone, repeat the request unconditionally
+            response = self._request("GET", url, search=search, params=params)
+        
+        if response.status_code == 200:
+            body = response.json()
+            if response.headers.get("ETag"):
+                self.http_cache.store(cache_key, response.headers["ETag"], body)
+            return body, False
+        elif response.status_code == 404:
+            self.logger.warning(f"Repository not found: {url}")
+            return {}, False
+        
+        try:
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise GitHubAPIError(f"Failed to fetch {url}: {e}")
+        # Other success statuses (e.g. 202 Accepted while stats are computed) carry no usable body
+        return {}, False
+    
+    def _make_graphql_request(self, query: str, variables: Optional[Dict] = None) -> Dict:
+        """Make rate-limited request to GitHub GraphQL API."""
+        data, errors = self._post_graphql(query, variables)
+        # Missing repositories come back as null data plus an error entry
+        for error in errors:
+            self.logger.warning(f"GraphQL error: {error.get('message', error)}")
+        return data
+    
+    def _post_graphql(self, query: str, variables: Optional[Dict] = None) -> Tuple[Dict, List[Dict]]:
+        """
+        Make rate-limited request to GitHub GraphQL API, returning its errors too.
+        
+        Returns:
+            Tuple of (data, error entries)
+            
+        Raises:
+            GitHubAPIError: If the request failed or returned no data at all
+                (e.g. a RATE_LIMITED error answered with HTTP 200)
+        """
+        payload = {"query": query}
+        if variables:
+            payload["variables"] = variables
+        response = self._request("POST", GITHUB_GRAPHQL_URL, json=payload)
+        
+        try:
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise GitHubAPIError(f"GraphQL query failed: {e}")
+        
+        payload = response.json()
+        errors = payload.get("errors") or []
+        data = payload.get("data")
+        if data is None:
+            messages = "; ".join(str(error.get("message", error)) for error in errors)
+            raise GitHubAPIError(f"GraphQL query returned no data: {messages or 'no errors given'}")
+        return data, errors
     
     def get_repository_info(self, repo_full_name: str) -> Optional[RepositoryInfo]:
-        """Get detailed information about a repository."""
+        """
+        Get detailed information about a repository known only by name.
+        
+        Repositories returned by search should go through enrich_repo instead,
+        which skips the /repos request.
+        """
         self.logger.info(f"Fetching repository info: {repo_full_name}")
         
         # Get basic repository info
-        repo_url = f"{GITHUB_API_BASE}/repos/{repo_full_name}"
-        repo_data = self._make_request(repo_url)
+        repo_url = _repo_api_url(repo_full_name)
+        repo_data, not_modified = self._make_conditional_request(repo_url)
         
         if not repo_data:
             return None
+        
+        # Don't spend a /languages request on a repository that fails regardless
+        provisional = self._build_repository_info(repo_data, None)
+        if provisional is None or not self._could_meet_quality_criteria(provisional):
+            return provisional
             
-        # Get language breakdown
-        languages_url = f"{GITHUB_API_BASE}/repos/{repo_full_name}/languages"
-        languages_data = self._make_request(languages_url)
+        # Get language breakdown. Any push changes the repository's ETag, so if
+        # the repository is unchanged the cached breakdown is still current.
+        languages_url = _repo_api_url(repo_full_name, "/languages")
+        languages_data = self.http_cache.load_body(HTTPCache.cache_key(languages_url)) if not_modified else None
+        if languages_data is None:
+            languages_data = self._make_request(languages_url)
         
-        # Calculate Erlang percentage
-        total_bytes = sum(languages_data.values()) if languages_data else 0
-        erlang_bytes = languages_data.get("Erlang", 0)
-        erlang_percentage = (erlang_bytes / total_bytes) if total_bytes > 0 else 0
+        self.repo_info_cache.put(repo_data, languages_data)
+        return self._build_repository_info(repo_data, languages_data)
+    
+    def enrich_repo(self, prefetched: Dict, estimate_languages: bool = False) -> Optional[RepositoryInfo]:
+        """
+        Complete a repository from its search result item.
         
-        # Calculate quality score
-        quality_score = self._calculate_quality_score(repo_data, languages_data)
+        Search items already carry every /repos field, so only the language
+        breakdown is fetched, and not even that if the repository info cache
+        holds an entry for the same updated_at, or if the repository fails the
+        criteria that don't depend on languages.
+        
+        Args:
+            prefetched: Repository object from the REST search API
+            estimate_languages: For repositories whose primary language is
+                Erlang, skip /languages and assume the configured
+                primary_erlang_estimate share (languages is left empty)
+            
+        Returns:
+            RepositoryInfo, or None if the item is malformed
+        """
+        repo_full_name = prefetched.get("full_name")
+        if not repo_full_name:
+            return None
+        
+        updated_at = prefetched.get("updated_at")
+        if updated_at and not self.fresh:
+            cached = self.repo_info_cache.get(repo_full_name, updated_at)
+            if cached:
+                self.logger.debug(f"Using cached repository info: {repo_full_name}")
+                return self._build_repository_info(*cached)
+        
+        provisional = self._build_repository_info(prefetched, None)
+        if provisional is None or not self._could_meet_quality_criteria(provisional):
+            return provisional
+        
+        estimate = REPO_DISCOVERY["primary_erlang_estimate"]
+        if (estimate_languages and prefetched.get("language") == "Erlang"
+                and REPO_DISCOVERY["min_erlang_percentage"] <= estimate):
+            return self._build_repository_info(prefetched, None, erlang_percentage=estimate)
+        
+        self.logger.info(f"Fetching languages: {repo_full_name}")
+        languages_data = self._make_request(_repo_api_url(repo_full_name, "/languages"))
+        
+        self.repo_info_cache.put(prefetched, languages_data)
+        return self._build_repository_info(prefetched, languages_data)
+    
+    def _build_repository_info(self, repo_data: Dict, languages_data: Optional[Dict],
+                               score: bool = True,
+                               erlang_percentage: Optional[float] = None) -> Optional[RepositoryInfo]:
+        """
+        Build RepositoryInfo from REST-shaped repository data and language breakdown.
+        
+        With score=False the quality score is left at 0 for a later _score_batch pass.
+        An explicit erlang_percentage overrides the one derived from languages_data.
+        """
+        # Calculate Erlang percentage
+        if erlang_percentage is None:
+            total_bytes = sum(languages_data.values()) if languages_data else 0
+            erlang_bytes = languages_data.get("Erlang", 0) if languages_data else 0
+            erlang_percentage = (erlang_bytes / total_bytes) if total_bytes > 0 else 0
         
         try:
-            return RepositoryInfo(
-                name=repo_data["name"],
-                full_name=repo_data["full_name"],
-                description=repo_data.get("description", "") or "",
-                stars=repo_data["stargazers_count"],
-                forks=repo_data["forks_count"],
-                size_kb=repo_data["size"],
-                language=repo_data.get("language", ""),
-                languages=languages_data or {},
-                created_at=repo_data["created_at"],
-                updated_at=repo_data["updated_at"],
-                clone_url=repo_data["clone_url"],
-                html_url=repo_data["html_url"],
-                archived=repo_data.get("archived", False),
-                has_wiki=repo_data.get("has_wiki", False),
-                has_issues=repo_data.get("has_issues", False),
-                erlang_percentage=erlang_percentage,
-                quality_score=quality_score
-            )
+            (name, full_name, stars, forks, size_kb,
+             created_at, updated_at, clone_url, html_url) = _REPO_REQUIRED(repo_data)
         except KeyError as e:
             self.logger.error(f"Missing required field in repository data: {e}")
             return None
+        optional = {key: repo_data.get(key, default) for key, default in _REPO_OPTIONAL.items()}
+        description = optional["description"] or ""
+        
+        # Calculate quality score
+        quality_score = self._score(
+            stars, updated_at, size_kb, erlang_percentage,
+            bool(optional["has_wiki"]), bool(optional["has_issues"]), bool(description),
+        ) if score else 0.0
+        
+        return RepositoryInfo(
+            name=name,
+            full_name=full_name,
+            description=description,
+            stars=stars,
+            forks=forks,
+            size_kb=size_kb,
+            language=optional["language"],
+            languages=languages_data or {},
+            created_at=created_at,
+            updated_at=updated_at,
+            clone_url=clone_url,
+            html_url=html_url,
+            archived=optional["archived"],
+            has_wiki=optional["has_wiki"],
+            has_issues=optional["has_issues"],
+            erlang_percentage=erlang_percentage,
+            quality_score=quality_score
+        )
+    
+    def _repository_info_from_graphql(self, node: Dict) -> Optional[RepositoryInfo]:
+        """Convert a GraphQL repository node into RepositoryInfo (unscored, see _score_batch)."""
+        languages_data = {
+            edge["node"]["name"]: edge["size"]
+            for edge in node.get("languages", {}).get("edges", [])
+        }
+        primary_language = node.get("primaryLanguage") or {}
+        
+        # Map GraphQL fields onto the REST field names used for scoring
+        repo_data = {
+            "name": node.get("name"),
+            "full_name": node.get("nameWithOwner"),
+            "description": node.get("description"),
+            "stargazers_count": node.get("stargazerCount"),
+            "forks_count": node.get("forkCount"),
+            "size": node.get("diskUsage") or 0,
+            "language": primary_language.get("name", ""),
+            "created_at": node.get("createdAt"),
+            "updated_at": node.get("updatedAt"),
+            "clone_url": f"{node.get('url')}.git",
+            "html_url": node.get("url"),
+            "archived": node.get("isArchived", False),
+            "has_wiki": node.get("hasWikiEnabled", False),
+            "has_issues": node.get("hasIssuesEnabled", False),
+        }
+        return self._build_repository_info(repo_data, languages_data, score=False)
+    
+    def graphql_fetch(self, repo_names: List[str]) -> List[RepositoryInfo]:
+        """
+        Fetch metadata for many repositories with batched GraphQL queries.
+        
+        Each query aliases up to `graphql_batch_size` repositories, replacing
+        the two REST calls per repository made by get_repository_info. Batches
+        are sent concurrently.
+        
+        Args:
+            repo_names: Repository full names ("owner/name")
+            
+        Returns:
+            List of RepositoryInfo for repositories that exist and are not forks
+        """
+        batch_size = REPO_DISCOVERY["graphql_batch_size"]
+        batches = [repo_names[start:start + batch_size] for start in range(0, len(repo_names), batch_size)]
+        if not batches:
+            return []
+        
+        repositories = []
+        fetched = 0
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            # Results are collected in submission order so output is deterministic
+            futures = [executor.submit(self._graphql_fetch_batch, batch) for batch in batches]
+            for batch, future in zip(batches, futures):
+                repositories.extend(future.result())
+                fetched += len(batch)
+                self.logger.info(f"Fetched metadata for {fetched}/{len(repo_names)} repositories via GraphQL")
+        
+        return self._with_scores(repositories)
+    
+    def _graphql_fetch_batch(self, batch: List[str]) -> List[RepositoryInfo]:
+        """Fetch one aliased GraphQL batch of repositories."""
+        aliases = []
+        for i, repo_name in enumerate(batch):
+            owner, _, name = repo_name.partition("/")
+            aliases.append(
+                f"r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) "
+                f"{{{GRAPHQL_REPOSITORY_FIELDS}}}"
+            )
+        query = "query {\n" + "\n".join(aliases) + "\n}"
+        
+        try:
+            data = self._make_graphql_request(query)
+        except GitHubAPIError as e:
+            self.logger.error(f"GraphQL batch failed: {e}")
+            return []
+        
+        repositories = []
+        for i, repo_name in enumerate(batch):
+            node = data.get(f"r{i}")
+            if not node:
+                self.logger.warning(f"Repository not found: {repo_name}")
+                continue
+            if node.get("isFork") and REPO_DISCOVERY["exclude_forks"]:
+                self.logger.debug(f"✗ Skipping fork {repo_name}")
+                continue
+                
+            repo_info = self._repository_info_from_graphql(node)
+            if repo_info:
+                repositories.append(repo_info)
+        
+        return repositories
+    
+    def prevalidate_repositories(self, repositories: List[RepositoryInfo]) -> List[RepositoryInfo]:
+        """
+        Drop repositories deleted, made private or archived since they were discovered.
+        
+        One aliased GraphQL query checks `graphql_batch_size` repositories, which
+        is far cheaper than a failing git clone per dead repository. Repositories
+        in batches that fail are kept unchecked.
+        
+        Args:
+            repositories: Repositories to check
+            
+        Returns:
+            The repositories still available, in their original order
+        """
+        batch_size = REPO_DISCOVERY["graphql_batch_size"]
+        batches = [repositories[start:start + batch_size] for start in range(0, len(repositories), batch_size)]
+        if not batches:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            futures = [executor.submit(self._prevalidate_batch, batch) for batch in batches]
+            available = [repo for future in futures for repo in future.result()]
+        
+        dropped = len(repositories) - len(available)
+        if dropped:
+            self.logger.info(f"Dropped {dropped} repositories that are gone, private or archived")
+        return available
+    
+    def _prevalidate_batch(self, batch: List[RepositoryInfo]) -> List[RepositoryInfo]:
+        """Check one aliased GraphQL batch of repositories."""
+        aliases = []
+        for i, repo in enumerate(batch):
+            owner, _, name = repo.full_name.partition("/")
+            aliases.append(f"r{i}: repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) {{ isArchived }}")
+        query = "query {\n" + "\n".join(aliases) + "\n}"
+        
+        try:
+            data, errors = self._post_graphql(query)
+            # Only NOT_FOUND says a repository is gone; any other error
+            # (rate limiting, timeouts) leaves the whole batch unchecked
+            unexpected = [error for error in errors if error.get("type") != "NOT_FOUND"]
+            if unexpected:
+                raise GitHubAPIError(f"GraphQL error: {unexpected[0].get('message', unexpected[0])}")
+        except GitHubAPIError as e:
+            self.logger.error(f"GraphQL prevalidation batch failed, keeping it unchecked: {e}")
+            return batch
+        
+        not_found = {error["path"][0] for error in errors if error.get("path")}
+        available = []
+        for i, repo in enumerate(batch):
+            alias = f"r{i}"
+            node = data.get(alias)
+            if alias in not_found:
+                self.logger.debug(f"✗ {repo.full_name} no longer available")
+            elif node and node["isArchived"] and not REPO_DISCOVERY["include_archived"]:
+                self.logger.debug(f"✗ {repo.full_name} has been archived")
+            else:
+                available.append(repo)
+        return available
+    
+    def graphql_search(self, query: str, max_results: int = 100) -> List[RepositoryInfo]:
+        """
+        Search for repositories with the GraphQL API, fetching full metadata in the same call.
+        
+        Unlike search_repositories, whose items still need a /languages call
+        each, every search page here already carries the fields needed to
+        score a repository. Pages are followed via the end cursor.
+        
+        Args:
+            query: GitHub search query (same syntax as the REST search)
+            max_results: Maximum number of repositories to return
+            
+        Returns:
+            List of RepositoryInfo for matching repositories that are not forks
+        """
+        self.logger.info(f"Searching repositories via GraphQL: {query}")
+        
+        graphql_query = f"""
+        query($q: String!, $first: Int!, $after: String) {{
+            search(query: $q, type: REPOSITORY, first: $first, after: $after) {{
+                pageInfo {{ endCursor hasNextPage }}
+                nodes {{ ... on Repository {{{GRAPHQL_REPOSITORY_FIELDS}}} }}
+            }}
+        }}
+        """
+        
+        repositories = []
+        cursor = None
+        
+        while len(repositories) < max_results:
+            variables = {
+                # GraphQL search has no sort argument, so sort via the query qualifier
+                "q": f"{query} sort:stars-desc",
+                "first": min(100, max_results - len(repositories)),
+                "after": cursor,
+            }
+            
+            try:
+                data = self._make_graphql_request(graphql_query, variables)
+            except GitHubAPIError as e:
+                self.logger.error(f"Search failed: {e}")
+                break
+            
+            search = data.get("search") or {}
+            nodes = search.get("nodes") or []
+            
+            for node in nodes:
+                if not node:
+                    continue
+                if node.get("isFork") and REPO_DISCOVERY["exclude_forks"]:
+                    continue
+                repo_info = self._repository_info_from_graphql(node)
+                if repo_info:
+                    repositories.append(repo_info)
+            
+            page_info = search.get("pageInfo") or {}
+            if not nodes or not page_info.get("hasNextPage"):
+                break
+            cursor = page_info.get("endCursor")
+        
+        repositories = self._with_scores(repositories[:max_results])
+        self.logger.info(f"Found {len(repositories)} repositories for query: {query}")
+        return repositories
     
-    def _calculate_quality_score(self, repo_data: Dict, languages_data: Dict) -> float:
-        """Calculate a quality score for the repository."""
+    @staticmethod
+    @lru_cache(maxsize=8192)
+    def _score(stars: int, updated_at_iso: str, size_kb: int, erlang_pct: float,
+               has_wiki: bool, has_issues: bool, has_description: bool) -> float:
+        """
+        Quality score from primitive repository fields (memoized).
+        
+        Recent activity is measured when a combination is first scored, which
+        is accurate enough for the lifetime of one discovery run.
+        """
         score = 0.0
         
         # Stars (normalized to 0-40 points, log scale)
-        stars = repo_data["stargazers_count"]
         if stars > 0:
             score += min(40, 10 * (stars ** 0.5) / 10)
         
         # Recent activity (0-20 points)
-        updated_at = datetime.fromisoformat(repo_data["updated_at"].replace('Z', '+00:00'))
+        updated_at = _parse_iso(updated_at_iso)
         days_since_update = (datetime.now(updated_at.tzinfo) - updated_at).days
         if days_since_update < 30:
             score += 20
@@ -185,22 +708,17 @@ class GitHubDiscovery:
             score += 10
         
         # Erlang percentage (0-20 points)
-        total_bytes = sum(languages_data.values()) if languages_data else 0
-        erlang_bytes = languages_data.get("Erlang", 0)
-        if total_bytes > 0:
-            erlang_pct = erlang_bytes / total_bytes
-            score += 20 * erlang_pct
+        score += 20 * erlang_pct
         
         # Repository features (0-10 points)
-        if repo_data.get("has_wiki"):
+        if has_wiki:
             score += 3
-        if repo_data.get("has_issues"):
+        if has_issues:
             score += 3
-        if repo_data.get("description"):
+        if has_description:
             score += 4
         
         # Size bonus/penalty (0-10 points)
-        size_kb = repo_data["size"]
         if 100 <= size_kb <= 50000:  # Sweet spot
             score += 10
         elif size_kb < 100:
@@ -209,6 +727,72 @@ class GitHubDiscovery:
         
         return min(100, score)
     
+    def _score_batch(self, repositories: List[RepositoryInfo]) -> np.ndarray:
+        """
+        Vectorized _score over many repositories.
+        
+        Returns:
+            Quality scores, one per repository, in input order
+        """
+        count = len(repositories)
+        stars = np.fromiter((r.stars for r in repositories), dtype=np.float64, count=count)
+        size_kb = np.fromiter((r.size_kb for r in repositories), dtype=np.float64, count=count)
+        erlang_pct = np.fromiter((r.erlang_percentage for r in repositories), dtype=np.float64, count=count)
+        has_wiki = np.fromiter((bool(r.has_wiki) for r in repositories), dtype=bool, count=count)
+        has_issues = np.fromiter((bool(r.has_issues) for r in repositories), dtype=bool, count=count)
+        has_description = np.fromiter((bool(r.description) for r in repositories), dtype=bool, count=count)
+        days = self._days_since_update(repositories)
+        
+        score = np.minimum(40, np.sqrt(np.maximum(stars, 0)))                    # Stars (0-40)
+        score += np.select([days < 30, days < 90, days < 365], [20, 15, 10], 0)  # Recent activity (0-20)
+        score += 20 * erlang_pct                                                 # Erlang percentage (0-20)
+        score += 3 * has_wiki + 3 * has_issues + 4 * has_description            # Features (0-10)
+        score += np.select([(size_kb >= 100) & (size_kb <= 50000), size_kb < 100], [10, 2], 0)  # Size (0-10)
+        
+        return np.minimum(100, score)
+    
+    def _quality_mask(self, repositories: List[RepositoryInfo]) -> np.ndarray:
+        """
+        Vectorized _meets_quality_criteria over many repositories.
+        
+        Returns:
+            Boolean mask, True for repositories that meet the criteria
+        """
+        criteria = REPO_DISCOVERY
+        count = len(repositories)
+        stars = np.fromiter((r.stars for r in repositories), dtype=np.float64, count=count)
+        forks = np.fromiter((r.forks for r in repositories), dtype=np.float64, count=count)
+        size_kb = np.fromiter((r.size_kb for r in repositories), dtype=np.float64, count=count)
+        erlang_pct = np.fromiter((r.erlang_percentage for r in repositories), dtype=np.float64, count=count)
+        archived = np.fromiter((bool(r.archived) for r in repositories), dtype=bool, count=count)
+        days = self._days_since_update(repositories)
+        
+        mask = (stars >= criteria["min_stars"]) & (size_kb >= criteria["min_size_kb"])
+        mask &= size_kb <= criteria["max_size_mb"] * 1024
+        mask &= erlang_pct >= criteria["min_erlang_percentage"]
+        if criteria["exclude_forks"]:
+            # Likely a fork if it has way more forks than stars
+            mask &= forks <= stars * 2
+        if not criteria["include_archived"]:
+            mask &= ~archived
+        mask &= days <= criteria["recent_activity_months"] * 30
+        return mask
+    
+    @staticmethod
+    def _days_since_update(repositories: List[RepositoryInfo]) -> np.ndarray:
+        """Days (fractional) since each repository's updated_at (GitHub timestamps are UTC)."""
+        updated = np.array([r.updated_at[:19] for r in repositories], dtype="datetime64[s]")
+        return (np.datetime64("now", "s") - updated) / np.timedelta64(1, "D")
+    
+    def _with_scores(self, repositories: List[RepositoryInfo]) -> List[RepositoryInfo]:
+        """Return copies of unscored repositories with quality scores filled in by _score_batch."""
+        if not repositories:
+            return repositories
+        # quality_score is the last field (asserted at import); positional construction is about twice
+        # as fast as dataclasses.replace, which re-reads every field by name
+        return [RepositoryInfo(*REPOSITORY_INFO_VALUES(repo)[:-1], score)
+                for repo, score in zip(repositories, self._score_batch(repositories).tolist())]
+    
     def _meets_quality_criteria(self, repo_info: RepositoryInfo) -> bool:
         """Check if repository meets our quality criteria."""
         criteria = REPO_DISCOVERY
@@ -234,127 +818,290 @@ class GitHubDiscovery:
             return False
             
         # Recent activity check
-        updated_at = datetime.fromisoformat(repo_info.updated_at.replace('Z', '+00:00'))
+        updated_at = _parse_iso(repo_info.updated_at)
         months_ago = datetime.now(updated_at.tzinfo) - timedelta(days=criteria["recent_activity_months"] * 30)
         if updated_at < months_ago:
             return False
             
         return True
     
-    def search_repositories(self, query: str, max_results: int = 100) -> List[str]:
-        """Search for repositories using GitHub search API."""
+    def _could_meet_quality_criteria(self, repo_info: RepositoryInfo) -> bool:
+        """Check the quality criteria that don't depend on the language breakdown."""
+        return self._meets_quality_criteria(replace(repo_info, erlang_percentage=1.0))
+    
+    def search_repositories(self, query: str, max_results: int = 100) -> List[Dict]:
+        """
+        Search for repositories using GitHub search API.
+        
+        The first page reports total_count, after which the remaining pages are
+        fetched concurrently (bounded by the search request semaphore).
+        
+        Returns:
+            Raw repository items from the search results (see enrich_repo)
+        """
         self.logger.info(f"Searching repositories: {query}")
         
-        repo_names = []
-        page = 1
         per_page = min(100, max_results)  # GitHub max is 100 per page
         
-        while len(repo_names) < max_results:
-            search_url = f"{GITHUB_API_BASE}/search/repositories"
-            params = {
-                "q": query,
-                "sort": "stars",
-                "order": "desc",
-                "page": page,
-                "per_page": per_page
-            }
-            
-            try:
-                data = self._make_request(search_url, params)
-                
-                if not data or "items" not in data:
-                    break
-                    
-                items = data["items"]
-                if not items:
-                    break
-                    
-                for item in items:
-                    repo_names.append(item["full_name"])
-                    if len(repo_names) >= max_results:
-                        break
-                        
-                # Check if we have more pages
-                if len(items) < per_page:
-                    break
-                    
-                page += 1
-                
-            except GitHubAPIError as e:
-                self.logger.error(f"Search failed: {e}")
-                break
+        first_page = self._search_page(query, 1, per_page)
+        if not first_page or "items" not in first_page:
+            self.logger.info(f"Found 0 repositories for query: {query}")
+            return []
+        pages = [first_page["items"]]
+        
+        # The search API serves at most 1000 results per query
+        available = min(first_page.get("total_count", 0), max_results, 1000)
+        page_count = -(-available // per_page)
+        if len(first_page["items"]) == per_page and page_count > 1:
+            with ThreadPoolExecutor(max_workers=min(PROCESSING_LIMITS["max_concurrent_searches"],
+                                                    page_count - 1)) as executor:
+                remaining_pages = executor.map(
+                    lambda page: (self._search_page(query, page, per_page) or {}).get("items") or [],
+                    range(2, page_count + 1)
+                )
+                pages.extend(remaining_pages)
+        
+        items = [item for page_items in pages for item in page_items if item.get("full_name")]
+        items = items[:max_results]
                 
-        self.logger.info(f"Found {len(repo_names)} repositories for query: {query}")
-        return repo_names
+        self.logger.info(f"Found {len(items)} repositories for query: {query}")
+        return items
+    
+    def _search_page(self, query: str, page: int, per_page: int) -> Optional[Dict]:
+        """Fetch one page of repository search results (None on failure)."""
+        search_url = f"{GITHUB_API_BASE}/search/repositories"
+        params = {
+            "q": query,
+            "sort": "stars",
+            "order": "desc",
+            "page": page,
+            "per_page": per_page
+        }
+        
+        try:
+            return self._make_request(search_url, params, search=True)
+        except GitHubAPIError as e:
+            self.logger.error(f"Search failed: {e}")
+            return None
     
     def discover_all_repositories(self) -> List[RepositoryInfo]:
         """Discover all repositories using seed list and search queries."""
         self.logger.info("Starting repository discovery")
         
-        all_repo_names: Set[str] = set()
+        # Candidate names keyed by casefolded name (GitHub names are case-insensitive)
+        all_repo_names: Dict[str, str] = {}
+        # Search result items by casefolded name; these skip the /repos request
+        prefetched: Dict[str, Dict] = {}
         discovered_repos: List[RepositoryInfo] = []
         
         # Add seed repositories
-        all_repo_names.update(SEED_REPOSITORIES)
-        self.logger.info(f"Added {len(SEED_REPOSITORIES)} seed repositories")
+        for repo_name in SEED_REPOSITORIES:
+            all_repo_names.setdefault(repo_name.casefold(), repo_name)
+        self.logger.info(f"Added {len(all_repo_names)} seed repositories")
         
-        # Search for additional repositories
-        for query in GITHUB_SEARCH_QUERIES:
-            try:
-                search_results = self.search_repositories(
-                    query, 
-                    REPO_DISCOVERY["max_repos_per_search"]
-                )
-                all_repo_names.update(search_results)
-                time.sleep(1)  # Brief pause between searches
-            except Exception as e:
-                self.logger.error(f"Search query failed '{query}': {e}")
-                continue
+        # With a token, search via GraphQL so results arrive with full metadata
+        if GITHUB_TOKEN:
+            return self._discover_with_graphql(all_repo_names)
+        
+        # Search for additional repositories, running all queries concurrently
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            future_to_query = {
+                executor.submit(self.search_repositories, query, REPO_DISCOVERY["max_repos_per_search"]): query
+                for query in GITHUB_SEARCH_QUERIES
+            }
+            for future in as_completed(future_to_query):
+                try:
+                    for item in future.result():
+                        key = item["full_name"].casefold()
+                        all_repo_names.setdefault(key, item["full_name"])
+                        prefetched.setdefault(key, item)
+                except Exception as e:
+                    self.logger.error(f"Search query failed '{future_to_query[future]}': {e}")
         
         self.logger.info(f"Total unique repositories to check: {len(all_repo_names)}")
         
-        # Get detailed info and filter
-        for i, repo_name in enumerate(all_repo_names):
-            if len(discovered_repos) >= PROCESSING_LIMITS["max_repositories"]:
-                self.logger.info(f"Reached maximum repository limit: {PROCESSING_LIMITS['max_repositories']}")
-                break
+        # Anonymous GraphQL access is not allowed, fall back to per-repository REST calls.
+        # Keep at most max_workers fetches in flight so we can stop once the limit is reached.
+        max_repositories = PROCESSING_LIMITS["max_repositories"]
+        pending_names = iter(all_repo_names.values())
+        processed = 0
+        # Different names can resolve to the same repository (renames redirect)
+        seen: Set[str] = set()
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight = {}
+            while True:
+                while len(in_flight) < self.max_workers and len(discovered_repos) < max_repositories:
+                    repo_name = next(pending_names, None)
+                    if repo_name is None:
+                        break
+                    item = prefetched.get(repo_name.casefold())
+                    if item:
+                        future = executor.submit(self.enrich_repo, item, estimate_languages=True)
+                    else:
+                        # Seeds the searches did not return: /repos and /languages
+                        future = executor.submit(self.get_repository_info, repo_name)
+                    in_flight[future] = repo_name
                 
-            try:
-                repo_info = self.get_repository_info(repo_name)
-                if repo_info and self._meets_quality_criteria(repo_info):
-                    discovered_repos.append(repo_info)
-                    self.logger.info(f"✓ Added {repo_name} (quality score: {repo_info.quality_score:.1f})")
-                elif repo_info:
-                    self.logger.debug(f"✗ Filtered out {repo_name} (quality score: {repo_info.quality_score:.1f})")
-                    
-            except Exception as e:
-                self.logger.error(f"Failed to process {repo_name}: {e}")
-                continue
+                if not in_flight:
+                    break
                 
-            # Progress update
-            if (i + 1) % 10 == 0:
-                self.logger.info(f"Processed {i + 1}/{len(all_repo_names)} repositories, "
-                               f"discovered {len(discovered_repos)} quality repos")
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    repo_name = in_flight.pop(future)
+                    processed += 1
+                    
+                    try:
+                        repo_info = future.result()
+                        if repo_info:
+                            key = repo_info.full_name.casefold()
+                            if key in seen:
+                                continue
+                            seen.add(key)
+                        if repo_info and self._meets_quality_criteria(repo_info):
+                            discovered_repos.append(repo_info)
+                            self.logger.info(f"✓ Added {repo_name} (quality score: {repo_info.quality_score:.1f})")
+                        elif repo_info:
+                            self.logger.debug(f"✗ Filtered out {repo_name} (quality score: {repo_info.quality_score:.1f})")
+                    except Exception as e:
+                        self.logger.error(f"Failed to process {repo_name}: {e}")
+                    
+                    # Progress update
+                    if processed % 10 == 0:
+                        self.logger.info(f"Processed {processed}/{len(all_repo_names)} repositories, "
+                                       f"discovered {len(discovered_repos)} quality repos")
+        
+        if len(discovered_repos) >= max_repositories:
+            self.logger.info(f"Reached maximum repository limit: {max_repositories}")
         
         # Sort by quality score
         discovered_repos.sort(key=lambda r: r.quality_score, reverse=True)
+        discovered_repos = discovered_repos[:max_repositories]
+        
+        # Erlang-primary repositories were kept on an estimated Erlang share;
+        # fetch the real breakdown only for the ones that made the cut
+        discovered_repos = self._complete_estimated_languages(discovered_repos, prefetched)
         
+        self.http_cache.save()
         self.logger.info(f"Repository discovery complete: {len(discovered_repos)} repositories")
         return discovered_repos
     
-    def save_repositories(self, repositories: List[RepositoryInfo], filename: str = None):
-        """Save discovered repositories to JSON file."""
+    def _complete_estimated_languages(self, repositories: List[RepositoryInfo],
+                                      prefetched: Dict[str, Dict]) -> List[RepositoryInfo]:
+        """
+        Replace estimated Erlang shares with real language breakdowns.
+        
+        Repositories that no longer meet the quality criteria are dropped.
+        
+        Args:
+            repositories: Repositories sorted by quality score
+            prefetched: Search result items by casefolded name
+            
+        Returns:
+            The completed repositories, re-sorted by quality score
+        """
+        estimated = [repo for repo in repositories
+                     if not repo.languages and repo.full_name.casefold() in prefetched]
+        if not estimated:
+            return repositories
+        
+        self.logger.info(f"Fetching language breakdowns for {len(estimated)} repositories")
+        completed: Dict[str, RepositoryInfo] = {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(estimated))) as executor:
+            future_to_name = {
+                executor.submit(self.enrich_repo, prefetched[repo.full_name.casefold()]): repo.full_name
+                for repo in estimated
+            }
+            for future in as_completed(future_to_name):
+                repo_name = future_to_name[future]
+                try:
+                    completed[repo_name] = future.result()
+                except Exception as e:
+                    self.logger.error(f"Failed to fetch languages for {repo_name}: {e}")
+        
+        result = []
+        for repo in repositories:
+            if repo.full_name in completed:
+                full_name, repo = repo.full_name, completed[repo.full_name]
+                if not repo or not self._meets_quality_criteria(repo):
+                    self.logger.debug(f"✗ Filtered out {full_name} after fetching languages")
+                    continue
+            result.append(repo)
+        
+        result.sort(key=lambda r: r.quality_score, reverse=True)
+        return result
+    
+    def _discover_with_graphql(self, seed_names: Dict[str, str]) -> List[RepositoryInfo]:
+        """
+        Discover repositories with GraphQL search, hydrating only seeds the searches missed.
+        
+        Args:
+            seed_names: Repository names keyed by casefolded name that must be
+                considered regardless of search results
+            
+        Returns:
+            Quality-filtered repositories sorted by quality score
+        """
+        found: Dict[str, RepositoryInfo] = {}
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            future_to_query = {
+                executor.submit(self.graphql_search, query, REPO_DISCOVERY["max_repos_per_search"]): query
+                for query in GITHUB_SEARCH_QUERIES
+            }
+            for future in as_completed(future_to_query):
+                try:
+                    for repo_info in future.result():
+                        found.setdefault(repo_info.full_name.casefold(), repo_info)
+                except Exception as e:
+                    self.logger.error(f"Search query failed '{future_to_query[future]}': {e}")
+        
+        # Seeds the searches did not return still need a batched metadata fetch
+        missing_seeds = sorted(name for key, name in seed_names.items() if key not in found)
+        for repo_info in self.graphql_fetch(missing_seeds):
+            found.setdefault(repo_info.full_name.casefold(), repo_info)
+        
+        self.logger.info(f"Total unique repositories to check: {len(found)}")
+        
+        candidates = list(found.values())
+        mask = self._quality_mask(candidates) if candidates else []
+        
+        discovered_repos = []
+        for repo_info, meets_criteria in zip(candidates, mask):
+            if meets_criteria:
+                discovered_repos.append(repo_info)
+                self.logger.info(f"✓ Added {repo_info.full_name} (quality score: {repo_info.quality_score:.1f})")
+            else:
+                self.logger.debug(f"✗ Filtered out {repo_info.full_name} (quality score: {repo_info.quality_score:.1f})")
+        
+        discovered_repos.sort(key=lambda r: r.quality_score, reverse=True)
+        discovered_repos = discovered_repos[:PROCESSING_LIMITS["max_repositories"]]
+        
+        self.http_cache.save()
+        self.logger.info(f"Repository discovery complete: {len(discovered_repos)} repositories")
+        return discovered_repos
+    
+    def save_repositories(self, repositories: List[RepositoryInfo], filename: str = None, pretty: bool = False):
+        """
+        Save discovered repositories to JSON file, streaming one record at a time.
+        
+        Args:
+            repositories: Repositories to save
+            filename: Destination JSON file (a msgpack copy is written alongside)
+            pretty: Indent each record (for debugging)
+        """
         if filename is None:
             filename = get_output_path("repositories.json")
             
-        repo_data = [asdict(repo) for repo in repositories]
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump({
-                "discovery_date": datetime.now().isoformat(),
-                "total_repositories": len(repositories),
-                "repositories": repo_data
-            }, f, indent=2, ensure_ascii=False)
+        header = {
+            "discovery_date": datetime.now().isoformat(),
+            "total_repositories": len(repositories),
+        }
+        
+        # JSON for humans, msgpack alongside it for fast reloads
+        jsonio.dump_stream(header, "repositories", repositories, filename, indent=pretty)
+        msgpackio.dump_stream(header, "repositories", repositories, msgpackio.binary_path(filename),
+                              default=RepositoryInfo.to_dict)
             
         self.logger.info(f"Saved {len(repositories)} repositories to {filename}")
 
@@ -4,12 +4,20 @@ Handles efficient git cloning with shallow clones and error recovery.
 """
 
 import os
+import re
+import enum
+import random
+import hashlib
 import subprocess
 import shutil
 import logging
-import json
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass, asdict
+import tempfile
+import uuid
+import atexit
+from typing import Any, Callable, List, Dict, Optional, Tuple
+from dataclasses import dataclass, fields
+from functools import partial
+from operator import attrgetter
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
@@ -18,23 +26,104 @@ import time
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import (
-    OUTPUT_CONFIG, PROCESSING_LIMITS, ERROR_HANDLING, 
-    get_clone_path, get_output_path
+    OUTPUT_CONFIG, PROCESSING_LIMITS, ERROR_HANDLING, CLONE_CONFIG,
+    ensure_directories, get_clone_cache_path, get_clone_path, get_output_path
 )
+from utils import jsonio
+from utils.fs import BackgroundRemover, directory_size, safe_rmtree
 
 # Import repository info from discovery module
 sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scrapers'))
 from github_discovery import RepositoryInfo
 
-@dataclass
+@dataclass(frozen=True)
 class CloneResult:
-    """Result of a repository clone operation."""
+    """Result of a repository clone operation (immutable)."""
+    __slots__ = (
+        "repo_info", "success", "local_path", "error_message",
+        "clone_time_seconds", "size_mb", "clone_filter",
+    )
+    
     repo_info: RepositoryInfo
     success: bool
     local_path: Optional[str]
     error_message: Optional[str]
     clone_time_seconds: float
     size_mb: float
+    clone_filter: Optional[str]  # Partial clone filter used, None if nothing was cloned (kept, updated or cached)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Field values as a plain dict, with repo_info flattened to a dict as well."""
+        values = dict(zip(CLONE_RESULT_FIELDS, CLONE_RESULT_VALUES(self)))
+        values["repo_info"] = self.repo_info.to_dict()
+        return values
+    
+    # Frozen slotted instances need explicit pickle support (setattr is blocked)
+    def __getstate__(self):
+        return CLONE_RESULT_VALUES(self)
+    
+    def __setstate__(self, state):
+        for name, value in zip(CLONE_RESULT_FIELDS, state):
+            object.__setattr__(self, name, value)
+
+# Field names in declaration order, and a getter returning their values as a tuple
+CLONE_RESULT_FIELDS = tuple(f.name for f in fields(CloneResult))
+CLONE_RESULT_VALUES = attrgetter(*CLONE_RESULT_FIELDS)
+
+class GitErrorKind(enum.Enum):
+    """How a failed git command should be handled."""
+    RETRYABLE = "retryable"  # Network trouble, throttling, server errors
+    NOT_FOUND = "not_found"  # Repository gone; retrying cannot help
+    AUTH = "auth"            # Private repository or credentials required
+    FATAL = "fatal"          # Local problem (disk full, bad path, ...)
+
+# Checked in order, first match wins; anything unmatched is retried
+_GIT_ERROR_PATTERNS = (
+    (GitErrorKind.RETRYABLE, re.compile(
+        r"rate limit|error: (429|5\d\d)|timed out|timeout|network|could not resolve host|"
+        r"connection (reset|refused|timed out)|early eof|rpc failed|remote end hung up",
+        re.IGNORECASE)),
+    (GitErrorKind.NOT_FOUND, re.compile(r"not found|error: 404|does not exist", re.IGNORECASE)),
+    (GitErrorKind.AUTH, re.compile(
+        r"authentication failed|error: 40[13]|could not read username|"
+        r"terminal prompts disabled|permission denied", re.IGNORECASE)),
+    (GitErrorKind.FATAL, re.compile(r"no space left on device|read-only file system|already exists",
+                                    re.IGNORECASE)),
+)
+_RETRY_AFTER = re.compile(r"retry-after:\s*(\d+)", re.IGNORECASE)
+
+def _classify_git_error(stderr: str) -> GitErrorKind:
+    """Classify the stderr of a failed git command."""
+    for kind, pattern in _GIT_ERROR_PATTERNS:
+        if pattern.search(stderr):
+            return kind
+    return GitErrorKind.RETRYABLE
+
+def _parse_count_objects(output: str) -> Optional[int]:
+    """Total object size in KiB (loose plus packed) from `git count-objects -v` output."""
+    sizes = {}
+    for line in output.splitlines():
+        key, _, value = line.partition(":")
+        sizes[key] = value.strip()
+    try:
+        return int(sizes["size"]) + int(sizes["size-pack"])
+    except (KeyError, ValueError):
+        return None
+
+def _link_or_copy(src: str, dst: str):
+    """Hardlink a file, falling back to a copy across filesystems."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+def _link_or_copy_clone_file(clone_path: str, src: str, dst: str):
+    """Hardlink a file of a clone if git never modifies it in place, otherwise copy it."""
+    git_dir = os.path.join(clone_path, ".git", "")
+    if src.startswith(git_dir) and not src.startswith(os.path.join(git_dir, "objects", "")):
+        shutil.copy2(src, dst)
+    else:
+        _link_or_copy(src, dst)
 
 class RepositoryCloner:
     """Handles cloning of GitHub repositories."""
@@ -44,9 +133,43 @@ class RepositoryCloner:
         self.max_workers = max_workers or PROCESSING_LIMITS["parallel_clone_workers"]
         
         # Ensure clone directory exists
-        clone_dir = OUTPUT_CONFIG["clone_directory"]
-        os.makedirs(clone_dir, exist_ok=True)
-        self.logger.info(f"Clone directory: {clone_dir}")
+        ensure_directories()
+        self.clone_dir = OUTPUT_CONFIG["clone_directory"]
+        self.logger.info(f"Clone directory: {self.clone_dir}")
+        
+        # Failed and replaced clones are renamed away and deleted off the worker threads
+        self.remover = BackgroundRemover()
+        self.remover.empty_trash(self.clone_dir)
+        self.remover.empty_trash(CLONE_CONFIG["cache_directory"])
+        
+        # Retry policy (see clone_repository)
+        self.max_retries = ERROR_HANDLING["max_retries"]
+        self.retry_delay = ERROR_HANDLING["retry_delay_seconds"]
+        self.max_retry_delay = ERROR_HANDLING["max_retry_delay_seconds"]
+        
+        # Never let git block a worker waiting for credentials on a terminal
+        self._git_env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+        if CLONE_CONFIG["use_ssh"]:
+            self._use_ssh()
+        
+        # Clones land in a persistent cache first and are hardlinked out of it,
+        # so later runs (or other work directories) skip the network entirely
+        self.use_clone_cache = CLONE_CONFIG["use_clone_cache"]
+        self.cache_ttl_seconds = CLONE_CONFIG["cache_ttl_hours"] * 3600
+        
+        self.reference_repository = (os.path.abspath(CLONE_CONFIG["reference_repository"])
+                                     if CLONE_CONFIG["use_reference_repository"] else None)
+        
+        # Private tmpfs directory clones are written to before being moved into place
+        self.scratch_root = None
+        self.scratch_reserve_bytes = CLONE_CONFIG["scratch_reserve_mb"] * 1024 * 1024
+        if CLONE_CONFIG["use_scratch_directory"] and os.path.isdir(CLONE_CONFIG["scratch_directory"]):
+            self.scratch_root = tempfile.mkdtemp(prefix="erlang-scraper-", dir=CLONE_CONFIG["scratch_directory"])
+            atexit.register(self._remove_scratch_root)
+        
+        self.large_repo_kb = CLONE_CONFIG["large_repo_kb"]
+        self.sparse_checkout_patterns = (list(CLONE_CONFIG["sparse_checkout_patterns"])
+                                         if CLONE_CONFIG["use_sparse_checkout"] else None)
         
         # Track cloning statistics
         self.stats = {
@@ -57,6 +180,28 @@ class RepositoryCloner:
             "total_time_seconds": 0.0
         }
     
+    def _use_ssh(self):
+        """
+        Make git reach github.com over SSH, multiplexing every clone over one connection.
+        
+        HTTPS clone URLs are rewritten by git itself (url.<base>.insteadOf), so
+        clone URLs and cache keys stay unchanged. The first ssh process becomes
+        the master; the others reuse its connection, skipping a handshake per clone.
+        """
+        control_path = os.path.join(tempfile.gettempdir(), "erlang-scraper-ssh-%C")
+        self._git_env["GIT_SSH_COMMAND"] = (
+            f"ssh -o BatchMode=yes -o ControlMaster=auto -o ControlPath={control_path} "
+            f"-o ControlPersist={CLONE_CONFIG['ssh_control_persist_seconds']}"
+        )
+        
+        # Append to any configuration already passed through the environment
+        index = int(self._git_env.get("GIT_CONFIG_COUNT", 0))
+        self._git_env.update({
+            "GIT_CONFIG_COUNT": str(index + 1),
+            f"GIT_CONFIG_KEY_{index}": "url.git@github.com:.insteadOf",
+            f"GIT_CONFIG_VALUE_{index}": "https://github.com/",
+        })
+    
     def _run_git_command(self, cmd: List[str], cwd: str = None, timeout: int = 300) -> Tuple[bool, str]:
         """
         Run a git command with timeout and error handling.
@@ -75,7 +220,8 @@ class RepositoryCloner:
                 cwd=cwd,
                 capture_output=True,
                 text=True,
-                timeout=timeout
+                timeout=timeout,
+                env=self._git_env
             )
             
             if result.returncode == 0:
@@ -90,25 +236,223 @@ class RepositoryCloner:
     
     def _get_directory_size(self, path: str) -> float:
         """Get directory size in MB."""
+        return directory_size(path) / (1024 * 1024)  # Convert to MB
+    
+    def _get_clone_size(self, path: str) -> float:
+        """
+        Get the size of a clone's object store in MB.
+        
+        Read from git's own bookkeeping (count-objects), which is far cheaper
+        than walking the tree; falls back to the directory size.
+        """
+        # Without .git, git -C would find and measure an enclosing repository
+        if os.path.isdir(os.path.join(path, ".git")):
+            success, output = self._run_git_command(["git", "-C", path, "count-objects", "-v"], timeout=60)
+            if success:
+                size_kb = _parse_count_objects(output)
+                if size_kb is not None:
+                    return size_kb / 1024  # Convert to MB
+        return self._get_directory_size(path)
+    
+    def _clone_filter(self, repo_info: RepositoryInfo) -> str:
+        """Pick the partial clone filter for a repository."""
+        # Giant repositories skip trees too; checkout fetches only those it needs
+        return "tree:0" if repo_info.size_kb > self.large_repo_kb else "blob:none"
+    
+    def _clone_command(self, clone_url: str, path: str, clone_filter: str) -> List[str]:
+        """Build the git clone command line."""
+        # Use shallow clone for efficiency (only latest commit)
+        cmd = [
+            "git", "clone",
+            "--depth", "1",  # Shallow clone
+            f"--filter={clone_filter}",  # Partial clone, objects fetched on demand
+            "--single-branch",  # Only default branch
+            "--no-tags",  # Skip tags
+        ]
+        if self.sparse_checkout_patterns:
+            cmd.append("--no-checkout")  # Checked out by _clone once sparse patterns are set
+        if self.reference_repository:
+            # Borrow objects the reference repository already has instead of downloading them
+            cmd += ["--reference-if-able", self.reference_repository]
+        return cmd + [clone_url, path]
+    
+    def _clone(self, repo_info: RepositoryInfo, path: str, clone_filter: str) -> Tuple[bool, str]:
+        """
+        Clone a repository to path, through the scratch directory when it has room.
+        
+        Returns:
+            Tuple of (success, output/error_message)
+        """
+        scratch_path = self._scratch_path(repo_info)
+        if scratch_path is None:
+            return self._git_clone(repo_info.clone_url, path, clone_filter)
+        
+        success, output = self._git_clone(repo_info.clone_url, scratch_path, clone_filter)
+        if success:
+            try:
+                shutil.move(scratch_path, path)  # A rename when on the same filesystem
+            except (OSError, shutil.Error) as e:
+                success, output = False, f"Failed to move clone out of scratch directory: {e}"
+        if not success:
+            self.remover.remove(scratch_path)
+        return success, output
+    
+    def _remove_scratch_root(self):
+        """Delete the scratch directory at exit, once queued deletions inside it are done."""
+        self.remover.drain()
+        if not safe_rmtree(self.scratch_root):
+            self.logger.warning(f"Scratch directory {self.scratch_root} was left behind, delete it manually")
+    
+    def _scratch_path(self, repo_info: RepositoryInfo) -> Optional[str]:
+        """Get a fresh scratch directory path for a clone, or None if it should not use one."""
+        if not self.scratch_root:
+            return None
+        try:
+            free = shutil.disk_usage(self.scratch_root).free
+        except OSError:
+            return None
+        if free < repo_info.size_kb * 2048 + self.scratch_reserve_bytes:
+            return None
+        return os.path.join(self.scratch_root, uuid.uuid4().hex)
+    
+    def _git_clone(self, clone_url: str, path: str, clone_filter: str) -> Tuple[bool, str]:
+        """
+        Clone a repository, checking out only the sparse checkout patterns if configured.
+        
+        Returns:
+            Tuple of (success, output/error_message)
+        """
+        success, output = self._run_git_command(
+            self._clone_command(clone_url, path, clone_filter), timeout=600)  # 10 minute timeout
+        if not success or not self.sparse_checkout_patterns:
+            return success, output
+        
+        # Set the patterns before the first checkout, so only matching blobs are fetched
+        success, output = self._run_git_command(
+            ["git", "-C", path, "sparse-checkout", "set", "--no-cone"] + self.sparse_checkout_patterns)
+        if success:
+            success, output = self._run_git_command(["git", "-C", path, "checkout", "--quiet"], timeout=600)
+        return success, output
+    
+    def prepare_reference_repository(self):
+        """
+        Create the shared reference repository and fetch any seed repositories it lacks.
+        
+        Seeds are fetched with full history (git ignores shallow references)
+        into refs/reference/<sha256 of URL>, so they are fetched only once.
+        """
+        if not self.reference_repository:
+            return
+        
+        if not os.path.exists(self.reference_repository):
+            success, output = self._run_git_command(["git", "init", "--quiet", "--bare", self.reference_repository])
+            if not success:
+                self.logger.warning(f"Could not create reference repository: {output}")
+                return
+        
+        for url in CLONE_CONFIG["reference_seed_urls"]:
+            ref = f"refs/reference/{hashlib.sha256(url.encode('utf-8')).hexdigest()}"
+            present, _ = self._run_git_command(
+                ["git", "-C", self.reference_repository, "rev-parse", "--verify", "--quiet", ref])
+            if present:
+                continue
+            
+            self.logger.info(f"Fetching {url} into reference repository")
+            success, output = self._run_git_command(
+                ["git", "-C", self.reference_repository, "fetch", "--quiet", "--no-tags", url, f"+HEAD:{ref}"],
+                timeout=3600)
+            if not success:
+                self.logger.warning(f"Could not fetch {url} into reference repository: {output}")
+        
+        # Every object is reachable from refs/reference/*, so gc never drops borrowed objects
+        self._run_git_command(["git", "-C", self.reference_repository, "gc", "--auto", "--quiet"], timeout=3600)
+    
+    def _fetch_latest(self, path: str) -> Tuple[bool, str]:
+        """
+        Bring an existing shallow clone up to date with its remote's tip.
+        
+        Only the objects that changed are downloaded, instead of the whole repository.
+        
+        Returns:
+            Tuple of (success, output/error_message)
+        """
+        success, output = self._run_git_command(
+            ["git", "-C", path, "fetch", "--depth", "1", "--no-tags", "origin"], timeout=600)
+        if success:
+            success, output = self._run_git_command(
+                ["git", "-C", path, "reset", "--quiet", "--hard", "FETCH_HEAD"])
+        return success, output
+    
+    def _update_clone_cache(self, repo_info: RepositoryInfo,
+                            refresh: bool = False) -> Tuple[bool, str, str, Optional[str]]:
+        """
+        Make sure the clone cache holds a current clone of a repository.
+        
+        Entries younger than the TTL are used as is; older ones are brought up
+        to date with a shallow fetch, falling back to a fresh clone.
+        
+        Args:
+            repo_info: Repository information
+            refresh: Refresh the entry even if it is younger than the TTL
+            
+        Returns:
+            Tuple of (success, output/error_message, cache entry path, partial clone
+            filter, which is None unless a fresh clone was made)
+        """
+        cache_path = get_clone_cache_path(repo_info.clone_url)
+        
+        if os.path.exists(os.path.join(cache_path, ".git")):
+            age = time.time() - os.stat(cache_path).st_mtime
+            if not refresh and age < self.cache_ttl_seconds:
+                self.logger.debug(f"Using cached clone of {repo_info.full_name}")
+                return True, "", cache_path, None
+            
+            success, output = self._fetch_latest(cache_path)
+            if success:
+                os.utime(cache_path)  # Directory mtime marks the last refresh
+                self.logger.debug(f"Refreshed cached clone of {repo_info.full_name}")
+                return True, output, cache_path, None
+            
+            self.logger.debug(f"Refreshing cached clone of {repo_info.full_name} failed, recloning: {output}")
+            self._cleanup_failed_clone(cache_path)
+        
+        clone_filter = self._clone_filter(repo_info)
+        success, output = self._clone(repo_info, cache_path, clone_filter)
+        if not success:
+            self._cleanup_failed_clone(cache_path)
+        return success, output, cache_path, clone_filter
+    
+    def _clone_from_cache(self, repo_info: RepositoryInfo, local_path: str,
+                          refresh: bool = False) -> Tuple[bool, str, Optional[str]]:
+        """
+        Clone a repository into the cache and hardlink the result to local_path.
+        
+        Git objects and working tree files are hardlinked, not copied, so the
+        cloned corpus costs almost no extra disk space; git never modifies
+        objects and replaces working tree files rather than rewriting them.
+        The rest of .git (reflogs, refs, index, config) is updated in place
+        and is copied, so later cache refreshes never change a local copy.
+        
+        Returns:
+            Tuple of (success, output/error_message, partial clone filter if the
+            cache entry was freshly cloned, else None)
+        """
+        success, output, cache_path, clone_filter = self._update_clone_cache(repo_info, refresh)
+        if not success:
+            return False, output, clone_filter
+        
         try:
-            total_size = 0
-            for dirpath, dirnames, filenames in os.walk(path):
-                for filename in filenames:
-                    filepath = os.path.join(dirpath, filename)
-                    try:
-                        total_size += os.path.getsize(filepath)
-                    except (OSError, IOError):
-                        # Skip files we can't read
-                        continue
-            return total_size / (1024 * 1024)  # Convert to MB
-        except Exception:
-            return 0.0
+            shutil.copytree(cache_path, local_path, symlinks=True,
+                            copy_function=partial(_link_or_copy_clone_file, cache_path))
+        except (OSError, shutil.Error) as e:
+            return False, f"Failed to copy from clone cache: {e}", clone_filter
+        return True, output, clone_filter
     
     def _cleanup_failed_clone(self, local_path: str):
         """Clean up a failed clone directory."""
         try:
             if os.path.exists(local_path):
-                shutil.rmtree(local_path)
+                self.remover.remove(local_path)
                 self.logger.debug(f"Cleaned up failed clone: {local_path}")
         except Exception as e:
             self.logger.warning(f"Failed to cleanup {local_path}: {e}")
@@ -119,7 +463,8 @@ class RepositoryCloner:
         
         Args:
             repo_info: Repository information
-            force_reclone: If True, delete existing clone and reclone
+            force_reclone: If True, update an existing clone to the latest commit,
+                recloning it if that fails
             
         Returns:
             CloneResult with operation details
@@ -129,27 +474,47 @@ class RepositoryCloner:
         
         self.logger.info(f"Cloning {repo_info.full_name} to {local_path}")
         
-        # Check if already cloned
-        if os.path.exists(local_path) and not force_reclone:
-            if os.path.exists(os.path.join(local_path, ".git")):
-                size_mb = self._get_directory_size(local_path)
+        # Check if already cloned (one stat: .git being a directory implies local_path exists)
+        if not force_reclone and os.path.isdir(os.path.join(local_path, ".git")):
+            size_mb = self._get_clone_size(local_path)
+            clone_time = time.time() - start_time
+            
+            self.logger.info(f"Repository {repo_info.full_name} already cloned")
+            return CloneResult(
+                repo_info=repo_info,
+                success=True,
+                local_path=local_path,
+                error_message=None,
+                clone_time_seconds=clone_time,
+                size_mb=size_mb,
+                clone_filter=None
+            )
+        
+        # Update an existing clone in place rather than downloading it all again
+        if force_reclone and os.path.isdir(os.path.join(local_path, ".git")):
+            success, output = self._fetch_latest(local_path)
+            if success:
+                size_mb = self._get_clone_size(local_path)
                 clone_time = time.time() - start_time
                 
-                self.logger.info(f"Repository {repo_info.full_name} already cloned")
+                self.logger.info(f"✓ Updated {repo_info.full_name} "
+                               f"({size_mb:.1f} MB in {clone_time:.1f}s)")
                 return CloneResult(
                     repo_info=repo_info,
                     success=True,
                     local_path=local_path,
                     error_message=None,
                     clone_time_seconds=clone_time,
-                    size_mb=size_mb
+                    size_mb=size_mb,
+                    clone_filter=None
                 )
+            self.logger.debug(f"Updating {repo_info.full_name} failed, recloning: {output}")
         
-        # Remove existing directory if force reclone
-        if force_reclone and os.path.exists(local_path):
+        # Clear the way: an existing clone being recloned, or leftovers of an interrupted one
+        if os.path.lexists(local_path):
             try:
-                shutil.rmtree(local_path)
-                self.logger.debug(f"Removed existing clone for recloning: {local_path}")
+                self.remover.remove(local_path)
+                self.logger.debug(f"Removed existing directory for recloning: {local_path}")
             except Exception as e:
                 error_msg = f"Failed to remove existing clone: {e}"
                 self.logger.error(error_msg)
@@ -159,72 +524,71 @@ class RepositoryCloner:
                     local_path=None,
                     error_message=error_msg,
                     clone_time_seconds=time.time() - start_time,
-                    size_mb=0.0
+                    size_mb=0.0,
+                    clone_filter=None
                 )
         
         # Attempt clone with retries
-        for attempt in range(ERROR_HANDLING["max_retries"]):
+        clone_filter = None
+        max_retries = self.max_retries
+        for attempt in range(max_retries):
+            retry_after = 0
             try:
-                # Use shallow clone for efficiency (only latest commit)
-                git_cmd = [
-                    "git", "clone",
-                    "--depth", "1",  # Shallow clone
-                    "--single-branch",  # Only default branch
-                    "--no-tags",  # Skip tags
-                    repo_info.clone_url,
-                    local_path
-                ]
-                
-                success, output = self._run_git_command(git_cmd, timeout=600)  # 10 minute timeout
+                if self.use_clone_cache:
+                    # Reports no filter when a cached entry was reused or fetched into
+                    success, output, clone_filter = self._clone_from_cache(repo_info, local_path,
+                                                                           refresh=force_reclone)
+                else:
+                    clone_filter = self._clone_filter(repo_info)
+                    success, output = self._clone(repo_info, local_path, clone_filter)
                 
                 if success:
-                    # Verify clone was successful
-                    if os.path.exists(os.path.join(local_path, ".git")):
-                        size_mb = self._get_directory_size(local_path)
-                        clone_time = time.time() - start_time
-                        
-                        self.logger.info(f"✓ Successfully cloned {repo_info.full_name} "
-                                       f"({size_mb:.1f} MB in {clone_time:.1f}s)")
-                        
-                        return CloneResult(
-                            repo_info=repo_info,
-                            success=True,
-                            local_path=local_path,
-                            error_message=None,
-                            clone_time_seconds=clone_time,
-                            size_mb=size_mb
-                        )
-                    else:
-                        error_msg = "Clone completed but .git directory not found"
-                        self.logger.error(f"✗ {repo_info.full_name}: {error_msg}")
-                        self._cleanup_failed_clone(local_path)
+                    # git exits 0 only once the clone is complete
+                    size_mb = self._get_clone_size(local_path)
+                    clone_time = time.time() - start_time
+                    
+                    self.logger.info(f"✓ Successfully cloned {repo_info.full_name} "
+                                   f"({size_mb:.1f} MB in {clone_time:.1f}s)")
+                    
+                    return CloneResult(
+                        repo_info=repo_info,
+                        success=True,
+                        local_path=local_path,
+                        error_message=None,
+                        clone_time_seconds=clone_time,
+                        size_mb=size_mb,
+                        clone_filter=clone_filter
+                    )
                 else:
                     error_msg = f"Git clone failed: {output}"
                     self.logger.warning(f"✗ {repo_info.full_name} (attempt {attempt + 1}): {error_msg}")
                     self._cleanup_failed_clone(local_path)
                     
-                    # If it's a network error, wait before retry
-                    if "network" in output.lower() or "timeout" in output.lower():
-                        if attempt < ERROR_HANDLING["max_retries"] - 1:
-                            sleep_time = ERROR_HANDLING["retry_delay_seconds"] * (attempt + 1)
-                            self.logger.info(f"Network error, waiting {sleep_time}s before retry")
-                            time.sleep(sleep_time)
-                    elif "not found" in output.lower() or "404" in output:
-                        # Repository not found, don't retry
+                    kind = _classify_git_error(output)
+                    if kind is not GitErrorKind.RETRYABLE:
+                        # Missing, private or locally broken: retrying cannot help
+                        self.logger.debug(f"Not retrying {repo_info.full_name} ({kind.value} error)")
                         break
+                    match = _RETRY_AFTER.search(output)
+                    if match:
+                        retry_after = int(match.group(1))
                         
             except Exception as e:
                 error_msg = f"Clone exception: {str(e)}"
                 self.logger.error(f"✗ {repo_info.full_name} (attempt {attempt + 1}): {error_msg}")
                 self._cleanup_failed_clone(local_path)
-                
-                if attempt < ERROR_HANDLING["max_retries"] - 1:
-                    sleep_time = ERROR_HANDLING["retry_delay_seconds"] * (attempt + 1)
-                    time.sleep(sleep_time)
+            
+            if attempt < max_retries - 1:
+                # Exponential backoff with full jitter, so workers don't retry in lockstep;
+                # a server-supplied Retry-After is the floor
+                ceiling = min(self.max_retry_delay, self.retry_delay * 2 ** attempt)
+                sleep_time = max(retry_after, random.uniform(0, ceiling))
+                self.logger.info(f"Retrying {repo_info.full_name} in {sleep_time:.1f}s")
+                time.sleep(sleep_time)
         
         # All attempts failed
         clone_time = time.time() - start_time
-        final_error = f"Failed after {ERROR_HANDLING['max_retries']} attempts"
+        final_error = f"Failed after {attempt + 1} attempts: {error_msg}"
         
         return CloneResult(
             repo_info=repo_info,
@@ -232,17 +596,20 @@ class RepositoryCloner:
             local_path=None,
             error_message=final_error,
             clone_time_seconds=clone_time,
-            size_mb=0.0
+            size_mb=0.0,
+            clone_filter=clone_filter
         )
     
     def clone_repositories(self, repositories: List[RepositoryInfo], 
-                          force_reclone: bool = False) -> List[CloneResult]:
+                          force_reclone: bool = False,
+                          progress_callback: Optional[Callable[[CloneResult], None]] = None) -> List[CloneResult]:
         """
         Clone multiple repositories in parallel.
         
         Args:
             repositories: List of repositories to clone
-            force_reclone: If True, reclone even if already exists
+            force_reclone: If True, refresh existing clones (fetch, falling back to a reclone)
+            progress_callback: Called with each CloneResult as it completes
             
         Returns:
             List of CloneResult objects
@@ -250,13 +617,34 @@ class RepositoryCloner:
         self.logger.info(f"Starting to clone {len(repositories)} repositories "
                         f"with {self.max_workers} parallel workers")
         
+        self.prepare_reference_repository()
+        
         results = []
+        total = len(repositories)
+        
+        # Results are appended to the partial results file every checkpoint_every
+        # clones, so an interrupted run resumes without redoing finished work
+        partial_file = get_output_path(OUTPUT_CONFIG["partial_clone_results_file"])
+        checkpoint_every = CLONE_CONFIG["checkpoint_every"]
+        pending = []
+        if force_reclone:
+            self._remove_partial_results(partial_file)
+        else:
+            resumed = self._load_partial_results(partial_file, repositories)
+            if resumed:
+                self.logger.info(f"Resuming: {len(resumed)} repositories already cloned by an earlier run")
+                for result in resumed:
+                    results.append(result)
+                    self._update_stats(result)
+                done = {result.repo_info.full_name for result in resumed}
+                repositories = [repo for repo in repositories if repo.full_name not in done]
         
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all clone tasks
+            # Submit all clone tasks, smallest first (shortest job first), so one
+            # giant repository cannot hold up a worker while the queue backs up
             future_to_repo = {
                 executor.submit(self.clone_repository, repo, force_reclone): repo
-                for repo in repositories
+                for repo in sorted(repositories, key=attrgetter("size_kb"))
             }
             
             # Process completed tasks
@@ -265,21 +653,21 @@ class RepositoryCloner:
                 try:
                     result = future.result()
                     results.append(result)
+                    self._update_stats(result)
+                    
+                    pending.append(result)
+                    if len(pending) >= checkpoint_every:
+                        jsonio.append_lines(pending, partial_file)
+                        pending.clear()
                     
-                    # Update statistics
-                    self.stats["total_attempted"] += 1
-                    if result.success:
-                        self.stats["successful_clones"] += 1
-                        self.stats["total_size_mb"] += result.size_mb
-                    else:
-                        self.stats["failed_clones"] += 1
-                    self.stats["total_time_seconds"] += result.clone_time_seconds
+                    if progress_callback:
+                        progress_callback(result)
                     
                     # Progress logging
                     completed = self.stats["total_attempted"]
-                    if completed % 10 == 0 or completed == len(repositories):
+                    if completed % 10 == 0 or completed == total:
                         success_rate = self.stats["successful_clones"] / completed * 100
-                        self.logger.info(f"Progress: {completed}/{len(repositories)} "
+                        self.logger.info(f"Progress: {completed}/{total} "
                                        f"({success_rate:.1f}% success rate)")
                         
                 except Exception as e:
@@ -291,9 +679,13 @@ class RepositoryCloner:
                         local_path=None,
                         error_message=str(e),
                         clone_time_seconds=0.0,
-                        size_mb=0.0
+                        size_mb=0.0,
+                        clone_filter=None
                     ))
         
+        if pending:
+            jsonio.append_lines(pending, partial_file)
+        
         # Sort results by success, then by repository name
         results.sort(key=lambda r: (not r.success, r.repo_info.full_name))
         
@@ -302,6 +694,58 @@ class RepositoryCloner:
         
         return results
     
+    def _update_stats(self, result: CloneResult):
+        """Count a finished clone in the statistics."""
+        self.stats["total_attempted"] += 1
+        if result.success:
+            self.stats["successful_clones"] += 1
+            self.stats["total_size_mb"] += result.size_mb
+        else:
+            self.stats["failed_clones"] += 1
+        self.stats["total_time_seconds"] += result.clone_time_seconds
+    
+    def _load_partial_results(self, partial_file: str,
+                              repositories: List[RepositoryInfo]) -> List[CloneResult]:
+        """
+        Load successful clone results an interrupted run left in the partial results file.
+        
+        Only repositories still being asked for whose clone is still on disk
+        are returned; they carry the current repository info. Failed clones
+        are retried.
+        """
+        wanted = {repo.full_name: repo for repo in repositories}
+        records = {}
+        try:
+            for record in jsonio.iter_lines(partial_file):
+                name = record["repo_info"]["full_name"]
+                if name in wanted and record["success"]:
+                    records[name] = record
+                else:
+                    records.pop(name, None)
+        except FileNotFoundError:
+            return []
+        except (KeyError, TypeError) as e:
+            self.logger.warning(f"Ignoring unreadable partial clone results in {partial_file}: {e}")
+            return []
+        
+        resumed = []
+        for name, record in records.items():
+            try:
+                if os.path.isdir(os.path.join(record["local_path"], ".git")):
+                    resumed.append(CloneResult(repo_info=wanted[name], **{
+                        field: record[field] for field in CLONE_RESULT_FIELDS[1:]
+                    }))
+            except (KeyError, TypeError):
+                continue  # Written by an older version
+        return resumed
+    
+    def _remove_partial_results(self, partial_file: str):
+        """Delete the partial results file once it is superseded."""
+        try:
+            os.remove(partial_file)
+        except FileNotFoundError:
+            pass
+    
     def _log_final_stats(self, results: List[CloneResult]):
         """Log final cloning statistics."""
         successful = [r for r in results if r.success]
@@ -328,31 +772,32 @@ class RepositoryCloner:
             if len(failed) > 10:
                 self.logger.info(f"  ... and {len(failed) - 10} more")
     
-    def save_clone_results(self, results: List[CloneResult], filename: str = None):
-        """Save clone results to JSON file."""
+    def save_clone_results(self, results: List[CloneResult], filename: str = None, pretty: bool = False):
+        """
+        Save clone results to JSON file, streaming one record at a time.
+        
+        Args:
+            results: Clone results to save
+            filename: Destination JSON file
+            pretty: Indent each record (for debugging)
+        """
         if filename is None:
             filename = get_output_path("clone_results.json")
         
-        # Convert results to serializable format
-        results_data = []
-        for result in results:
-            result_dict = asdict(result)
-            # Convert RepositoryInfo to dict
-            result_dict["repo_info"] = asdict(result.repo_info)
-            results_data.append(result_dict)
-        
+        successful = [r for r in results if r.success]
         clone_summary = {
             "clone_date": time.strftime("%Y-%m-%d %H:%M:%S"),
             "total_repositories": len(results),
-            "successful_clones": len([r for r in results if r.success]),
-            "failed_clones": len([r for r in results if not r.success]),
-            "total_size_mb": sum(r.size_mb for r in results if r.success),
+            "successful_clones": len(successful),
+            "failed_clones": len(results) - len(successful),
+            "total_size_mb": sum(r.size_mb for r in successful),
             "statistics": self.stats,
-            "results": results_data
         }
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(clone_summary, f, indent=2, ensure_ascii=False)
+        # orjson encodes CloneResult and its nested RepositoryInfo directly
+        jsonio.dump_stream(clone_summary, "results", results, filename, indent=pretty)
+        # The complete results supersede what an interrupted run checkpointed
+        self._remove_partial_results(get_output_path(OUTPUT_CONFIG["partial_clone_results_file"]))
         
         self.logger.info(f"Clone results saved to {filename}")
     
@@ -0,0 +1,39 @@
+"""
+Manual check of the rate limiter's request pacing.
+Runs a handful of requests through a deliberately low hourly limit and prints
+how long each one waited.
+"""
+
+import time
+import logging
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.rate_limiter import RateLimiter
+
+def main():
+    """Test rate limiter functionality."""
+    logging.basicConfig(level=logging.DEBUG)
+    
+    # Test basic rate limiter
+    limiter = RateLimiter(requests_per_hour=10)  # Very low for testing
+    
+    print("Testing rate limiter...")
+    for i in range(15):
+        print(f"Request {i+1}: ", end="")
+        
+        start_time = time.monotonic()
+        limiter.wait_if_needed()
+        limiter.record_request()
+        elapsed = time.monotonic() - start_time
+        
+        print(f"took {elapsed:.1f}s")
+        
+        # Show status every few requests
+        if (i + 1) % 5 == 0:
+            status = limiter.get_status()
+            print(f"Status: {status['requests_remaining']}/{status['effective_limit']} requests remaining")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Tests for GitHub discovery request handling.
+Run with: python -m unittest discover tests
+"""
+
+import unittest
+from unittest import mock
+
+# Import our modules (assumes tests/ is next to the package modules)
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapers.github_discovery import GitHubDiscovery, RepositoryInfo
+
+def make_repo(full_name: str) -> RepositoryInfo:
+    """A minimal repository record."""
+    return RepositoryInfo(
+        name=full_name.split("/")[1], full_name=full_name, description="", stars=50, forks=1,
+        size_kb=500, language="Erlang", languages={"Erlang": 1}, created_at="2020-01-01T00:00:00Z",
+        updated_at="2026-01-01T00:00:00Z", clone_url=f"https://github.com/{full_name}.git",
+        html_url=f"https://github.com/{full_name}", archived=False, has_wiki=True, has_issues=True,
+        erlang_percentage=1.0, quality_score=50.0,
+    )
+
+def make_discovery() -> GitHubDiscovery:
+    """A GitHubDiscovery whose caches never touch the filesystem."""
+    http_cache = mock.Mock()
+    http_cache.get_etag.return_value = None
+    return GitHubDiscovery(http_cache=http_cache, repo_info_cache=mock.Mock())
+
+class ConditionalRequestTest(unittest.TestCase):
+    """Responses other than 200/304/404 from _make_conditional_request."""
+
+    def setUp(self):
+        self.discovery = make_discovery()
+
+    def _respond(self, status_code: int):
+        response = mock.Mock(status_code=status_code, headers={})
+        self.discovery._request = mock.Mock(return_value=response)
+
+    def test_accepted_returns_empty_body(self):
+        # Stats endpoints answer 202 while GitHub computes the data
+        self._respond(202)
+        self.assertEqual(self.discovery._make_conditional_request("https://api.github.com/x"), ({}, False))
+        self.assertEqual(self.discovery._make_request("https://api.github.com/x"), {})
+
+    def test_accepted_repository_info_is_none(self):
+        self._respond(202)
+        self.assertIsNone(self.discovery.get_repository_info("owner/repo"))
+
+class PrevalidationTest(unittest.TestCase):
+    """prevalidate_repositories drops only repositories GitHub reports as NOT_FOUND."""
+
+    def setUp(self):
+        self.discovery = make_discovery()
+        self.repos = [make_repo(f"owner/repo{i}") for i in range(3)]
+
+    def _respond(self, payload: dict):
+        response = mock.Mock(status_code=200, headers={})
+        response.json.return_value = payload
+        self.discovery._request = mock.Mock(return_value=response)
+
+    def _available(self) -> list:
+        return [repo.full_name for repo in self.discovery.prevalidate_repositories(self.repos)]
+
+    def test_drops_not_found_aliases(self):
+        self._respond({
+            "data": {"r0": {"isArchived": False}, "r1": None, "r2": {"isArchived": False}},
+            "errors": [{"type": "NOT_FOUND", "path": ["r1"], "message": "Could not resolve"}],
+        })
+        self.assertEqual(self._available(), ["owner/repo0", "owner/repo2"])
+
+    def test_drops_archived_repositories(self):
+        self._respond({"data": {"r0": {"isArchived": True}, "r1": {"isArchived": False},
+                                "r2": {"isArchived": False}}})
+        with mock.patch.dict("scrapers.github_discovery.REPO_DISCOVERY", include_archived=False):
+            self.assertEqual(self._available(), ["owner/repo1", "owner/repo2"])
+
+    def test_keeps_batch_when_data_is_null(self):
+        self._respond({"data": None, "errors": [{"type": "RATE_LIMITED", "message": "API rate limit exceeded"}]})
+        self.assertEqual(self._available(), [repo.full_name for repo in self.repos])
+
+    def test_keeps_batch_on_other_errors(self):
+        self._respond({
+            "data": {"r0": {"isArchived": False}, "r1": None, "r2": None},
+            "errors": [{"type": "NOT_FOUND", "path": ["r1"]}, {"type": "TIMEOUT", "path": ["r2"]}],
+        })
+        self.assertEqual(self._available(), [repo.full_name for repo in self.repos])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+"""
+Tests for the GitHub rate limiter.
+Run with: python -m unittest discover tests
+"""
+
+import time
+import unittest
+from unittest import mock
+
+# Import our modules (assumes tests/ is next to the package modules)
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.rate_limiter import GitHubRateLimiter, RateLimiter
+
+class FakeClock:
+    """Stands in for the time module; sleeping advances it instead of blocking."""
+
+    def __init__(self):
+        self.now_ns = 1_000_000_000_000
+        self.sleeps = []
+        self.advance_on_sleep = True
+
+    def monotonic_ns(self) -> int:
+        return self.now_ns
+
+    def time(self) -> float:
+        return 1_700_000_000 + self.now_ns / 1e9
+
+    def advance(self, seconds: float):
+        self.now_ns += int(seconds * 1e9)
+
+    def sleep(self, seconds: float) -> bool:
+        self.sleeps.append(seconds)
+        if self.advance_on_sleep:
+            self.advance(seconds)
+        return True
+
+class FakeClockMixin:
+    """Limiter mixin whose sleeps go to the test's FakeClock."""
+
+    clock: FakeClock
+
+    def sleep(self, seconds: float) -> bool:
+        return self.clock.sleep(seconds)
+
+class FakeClockRateLimiter(FakeClockMixin, RateLimiter):
+    pass
+
+class FakeClockGitHubRateLimiter(FakeClockMixin, GitHubRateLimiter):
+    pass
+
+class ClockTestCase(unittest.TestCase):
+    """Runs each test with utils.rate_limiter reading time from a FakeClock."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch("utils.rate_limiter.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def make(self, cls, *args, **kwargs):
+        limiter = cls(*args, **kwargs)
+        limiter.clock = self.clock
+        return limiter
+
+class TokenBucketTest(ClockTestCase):
+    """Refill, debt and sleep math of RateLimiter's token bucket."""
+
+    def setUp(self):
+        super().setUp()
+        # One token per second, no buffer
+        self.limiter = self.make(FakeClockRateLimiter, requests_per_hour=3600, buffer_percentage=0.0)
+
+    def test_full_bucket_admits_immediately(self):
+        self.assertTrue(self.limiter.wait_if_needed())
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertAlmostEqual(self.limiter.get_status()["tokens"], 3599)
+
+    def test_refill_is_proportional_to_elapsed_time(self):
+        self.limiter.bucket = (0.0, self.clock.monotonic_ns())
+        self.clock.advance(2.5)
+        self.assertAlmostEqual(self.limiter.get_status()["tokens"], 2.5)
+
+    def test_refill_is_capped_at_effective_limit(self):
+        self.clock.advance(7200)
+        self.assertEqual(self.limiter.get_status()["tokens"], 3600)
+
+    def test_empty_bucket_goes_into_debt_and_queues_waiters(self):
+        # Concurrent callers: all arrive before any of them finishes sleeping
+        self.clock.advance_on_sleep = False
+        self.limiter.bucket = (0.0, self.clock.monotonic_ns())
+        for _ in range(3):
+            self.assertTrue(self.limiter.wait_if_needed())
+        # Each takes its token at once and sleeps until that token is refilled
+        self.assertEqual([round(s, 6) for s in self.clock.sleeps], [1.0, 2.0, 3.0])
+        self.assertAlmostEqual(self.limiter.get_status()["tokens"], -3.0)
+
+    def test_debt_is_repaid_by_refill(self):
+        self.limiter.bucket = (-3.0, self.clock.monotonic_ns())
+        self.clock.advance(4)
+        self.assertAlmostEqual(self.limiter.get_status()["tokens"], 1.0)
+        self.assertTrue(self.limiter.wait_if_needed())
+        self.assertEqual(self.clock.sleeps, [])
+
+class SearchWindowTest(ClockTestCase):
+    """The sliding one-minute window for the search API."""
+
+    def setUp(self):
+        super().setUp()
+        self.limiter = self.make(FakeClockGitHubRateLimiter, token_provided=True)
+        self.limiter.min_delay = 0
+        self.limiter.search_limit = 2
+
+    def test_admits_up_to_limit_without_sleeping(self):
+        self.assertTrue(self.limiter.wait_for_slot("search"))
+        self.clock.advance(10)
+        self.assertTrue(self.limiter.wait_for_slot("search"))
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_waits_for_oldest_request_to_expire(self):
+        self.limiter.wait_for_slot("search")
+        self.clock.advance(10)
+        self.limiter.wait_for_slot("search")
+        self.assertTrue(self.limiter.wait_for_slot("search"))
+        self.assertEqual(len(self.clock.sleeps), 1)
+        self.assertAlmostEqual(self.clock.sleeps[0], 50.0)
+        self.assertEqual(len(self.limiter.search_times), 2)
+
+    def test_expired_requests_leave_the_window(self):
+        self.limiter.wait_for_slot("search")
+        self.limiter.wait_for_slot("search")
+        self.clock.advance(60)
+        self.assertTrue(self.limiter.wait_for_slot("search"))
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertEqual(len(self.limiter.search_times), 1)
+
+    def test_window_applies_after_github_reports_a_budget(self):
+        self.limiter.record_request({
+            "X-RateLimit-Limit": "30", "X-RateLimit-Remaining": "30",
+            "X-RateLimit-Reset": str(int(self.clock.time()) + 60), "X-RateLimit-Resource": "search",
+        })
+        for _ in range(3):
+            self.limiter.wait_for_slot("search")
+        self.assertEqual(len(self.clock.sleeps), 1)
+
+def core_headers(remaining: int, limit: int = 5000) -> dict:
+    """GitHub rate limit headers for a core API response."""
+    return {
+        "X-RateLimit-Limit": str(limit),
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(int(time.time()) + 1800),
+        "X-RateLimit-Used": str(limit - remaining),
+        "X-RateLimit-Resource": "core",
+    }
+
+class NotModifiedRefundTest(unittest.TestCase):
+    """304 responses are free on GitHub and must not cost a token."""
+
+    def setUp(self):
+        self.limiter = GitHubRateLimiter(token_provided=True)
+        self.limiter.min_delay = 0
+
+    def tokens(self) -> float:
+        return self.limiter.get_status()["tokens"]
+
+    def test_not_modified_leaves_tokens_unchanged(self):
+        self.limiter.record_request(core_headers(4000), 200)
+        before = self.tokens()
+        self.assertTrue(self.limiter.wait_for_slot("core"))
+        self.limiter.record_request(core_headers(4000), 304)
+        self.assertAlmostEqual(self.tokens(), before, delta=0.01)
+
+    def test_ok_response_costs_a_token(self):
+        self.limiter.record_request(core_headers(4000), 200)
+        before = self.tokens()
+        self.assertTrue(self.limiter.wait_for_slot("core"))
+        self.limiter.record_request(core_headers(3999), 200)
+        self.assertAlmostEqual(self.tokens(), before - 1, delta=0.01)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Tests for repository cloning.
+Run with: python -m unittest discover tests
+"""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+# Import our modules (assumes tests/ is next to the package modules)
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrapers.repo_cloner import CloneResult, GitErrorKind, RepositoryCloner, _classify_git_error
+from utils import jsonio
+from utils.fs import safe_rmtree
+from test_github_discovery import make_repo
+
+class ClassifyGitErrorTest(unittest.TestCase):
+    """_classify_git_error decides whether a failed clone is retried."""
+
+    def test_network_errors_are_retryable(self):
+        for stderr in (
+            "fatal: unable to access 'https://github.com/a/b.git/': Could not resolve host: github.com",
+            "error: RPC failed; curl 56 GnuTLS recv error\nfatal: early EOF",
+            "fatal: unable to access 'https://github.com/a/b.git/': The requested URL returned error: 502",
+            "fatal: the remote end hung up unexpectedly",
+        ):
+            with self.subTest(stderr=stderr):
+                self.assertIs(_classify_git_error(stderr), GitErrorKind.RETRYABLE)
+
+    def test_missing_repository_is_not_found(self):
+        self.assertIs(_classify_git_error("remote: Repository not found.\n"
+                                          "fatal: repository 'https://github.com/a/b.git/' not found"),
+                      GitErrorKind.NOT_FOUND)
+
+    def test_credential_prompt_is_auth(self):
+        self.assertIs(_classify_git_error("fatal: could not read Username for 'https://github.com': "
+                                          "terminal prompts disabled"),
+                      GitErrorKind.AUTH)
+
+    def test_unknown_errors_are_retryable(self):
+        self.assertIs(_classify_git_error("fatal: something unexpected"), GitErrorKind.RETRYABLE)
+
+class ResumeTest(unittest.TestCase):
+    """clone_repositories resumes from the partial results of an interrupted run."""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(safe_rmtree, self.root)
+        for patcher in (
+            mock.patch.dict("scrapers.repo_cloner.OUTPUT_CONFIG", base_directory=self.root,
+                            clone_directory=os.path.join(self.root, "clones")),
+            mock.patch.dict("scrapers.repo_cloner.CLONE_CONFIG", cache_directory=os.path.join(self.root, "cache"),
+                            use_reference_repository=False, use_scratch_directory=False),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        os.makedirs(os.path.join(self.root, "clones"))
+        self.cloner = RepositoryCloner(max_workers=2)
+        self.partial_file = os.path.join(self.root, "clone_results.partial.jsonl")
+
+    def _result(self, full_name: str, success: bool, on_disk: bool = True) -> CloneResult:
+        local_path = os.path.join(self.root, "clones", full_name.replace("/", "_"))
+        if success and on_disk:
+            os.makedirs(os.path.join(local_path, ".git"))
+        return CloneResult(make_repo(full_name), success, local_path if success else None,
+                           None if success else "Git clone failed", 1.0, 2.0, None)
+
+    def test_skips_done_and_retries_failed(self):
+        jsonio.append_lines([
+            self._result("owner/done", True),
+            self._result("owner/failed", False),
+            self._result("owner/deleted", True, on_disk=False),
+        ], self.partial_file)
+        repos = [make_repo(name) for name in ("owner/done", "owner/failed", "owner/deleted", "owner/new")]
+
+        cloned = []
+        def clone_repository(repo, force_reclone=False):
+            cloned.append(repo.full_name)
+            return CloneResult(repo, True, "/x", None, 0.1, 1.0, "blob:none")
+        self.cloner.clone_repository = clone_repository
+
+        results = self.cloner.clone_repositories(repos)
+
+        self.assertEqual(sorted(cloned), ["owner/deleted", "owner/failed", "owner/new"])
+        self.assertEqual(sorted(r.repo_info.full_name for r in results), sorted(r.full_name for r in repos))
+        self.assertTrue(all(r.success for r in results))
+
+    def test_force_reclone_ignores_partial_results(self):
+        jsonio.append_lines([self._result("owner/done", True)], self.partial_file)
+        cloned = []
+        def clone_repository(repo, force_reclone=False):
+            cloned.append(repo.full_name)
+            return CloneResult(repo, True, "/x", None, 0.1, 1.0, None)
+        self.cloner.clone_repository = clone_repository
+
+        self.cloner.clone_repositories([make_repo("owner/done")], force_reclone=True)
+        self.assertEqual(cloned, ["owner/done"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Batched checkpoint writer for the scraper pipeline.
+Coalesces frequent progress updates so checkpoint IO happens at most once per
+interval (or per batch of updates) instead of once per event.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from typing import Callable, Dict
+
+class CheckpointBatcher:
+    """Merges checkpoint deltas and flushes them from a background thread."""
+
+    def __init__(self, flush_fn: Callable[[str, dict], None],
+                 flush_interval: float = 1.0, max_batch: int = 100):
+        """
+        Initialize the batcher and start its flush thread.
+
+        Args:
+            flush_fn: Called as flush_fn(stage, merged_delta) for each stage with pending updates
+            flush_interval: Maximum seconds an update waits before being flushed
+            max_batch: Number of pending updates that triggers an early flush
+        """
+        self.flush_fn = flush_fn
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.logger = logging.getLogger(__name__)
+
+        self.condition = threading.Condition()
+        self.pending: Dict[str, dict] = {}
+        self.pending_count = 0
+        self.closed = False
+
+        self.thread = threading.Thread(target=self._run, name="checkpoint-batcher", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def update(self, stage: str, delta: dict):
+        """
+        Queue a checkpoint delta; later keys overwrite earlier ones within a batch.
+
+        Args:
+            stage: Pipeline stage the delta belongs to
+            delta: Partial checkpoint data to merge
+        """
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("CheckpointBatcher is closed")
+            self.pending.setdefault(stage, {}).update(delta)
+            self.pending_count += 1
+            if self.pending_count >= self.max_batch:
+                self.condition.notify()
+
+    def flush(self):
+        """Write out all pending deltas now."""
+        with self.condition:
+            batch = self.pending
+            self.pending = {}
+            self.pending_count = 0
+
+        for stage, delta in batch.items():
+            try:
+                self.flush_fn(stage, delta)
+            except Exception as e:
+                self.logger.error(f"Checkpoint flush failed for stage {stage}: {e}")
+
+    def close(self):
+        """Stop the flush thread and write out anything still pending."""
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
+        self.flush()
+
+    def _run(self):
+        """Flush loop: wake on the interval or when a batch fills up."""
+        while True:
+            with self.condition:
+                deadline = time.monotonic() + self.flush_interval
+                while not self.closed and self.pending_count < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                if self.closed:
+                    return
+            self.flush()
@@ -0,0 +1,207 @@
+"""
+Filesystem helpers for walking cloned repositories.
+Uses os.scandir directly so file type and size come from the cached
+DirEntry data instead of separate stat calls per file.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import shutil
+import threading
+import uuid
+from typing import Iterator, Tuple
+
+# Import our config (assumes config.py is in parent directory)
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import FILE_PROCESSING, is_excluded
+
+def iter_source_files(root: str) -> Iterator[Tuple[str, int]]:
+    """
+    Recursively find Erlang source files under a directory.
+
+    Excluded directories are pruned without being descended into, and files
+    are filtered by extension, exclude patterns and size limits.
+
+    Args:
+        root: Directory to walk (typically a cloned repository)
+
+    Yields:
+        (path, size_in_bytes) tuples for each matching file
+    """
+    extensions = tuple(FILE_PROCESSING["target_extensions"])
+    min_size = FILE_PROCESSING["min_file_size_bytes"]
+    max_size = FILE_PROCESSING["max_file_size_bytes"]
+
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            # Trailing slash lets "*/deps/*" style patterns match the directory itself
+                            if not is_excluded(entry.path + "/"):
+                                stack.append(entry.path)
+                            continue
+
+                        if not entry.name.endswith(extensions) or not entry.is_file(follow_symlinks=False):
+                            continue
+
+                        if is_excluded(entry.path):
+                            continue
+
+                        size = entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        # Skip entries we can't read
+                        continue
+
+                    if min_size <= size <= max_size:
+                        yield entry.path, size
+        except OSError:
+            continue
+
+def directory_size(root: str) -> int:
+    """
+    Total size in bytes of all regular files under a directory.
+    
+    Symlinks are neither followed nor counted, and unreadable entries are skipped.
+    
+    Args:
+        root: Directory to measure
+        
+    Returns:
+        Size in bytes
+    """
+    total_size = 0
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total_size += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total_size
+
+def safe_rmtree(path: str) -> bool:
+    """
+    Delete a directory tree, making read-only entries writable instead of giving up on them.
+    
+    Git marks pack files and some directories read-only, which can stop a
+    plain rmtree (on Windows, or wherever a directory lost its write bit).
+    Failures are logged once for the whole tree.
+    
+    Args:
+        path: Tree to delete
+        
+    Returns:
+        True if everything was deleted
+    """
+    failed = []
+    
+    def chmod_and_retry(func, failed_path, exc):
+        # onerror (before 3.12) passes exc_info rather than the exception
+        if isinstance(exc, tuple):
+            exc = exc[1]
+        if isinstance(exc, FileNotFoundError):
+            return
+        # Only a failed delete can be fixed by a chmod; scandir/open/lstat
+        # failures are recorded as they are
+        if func not in (os.unlink, os.rmdir, os.remove):
+            failed.append(failed_path)
+            return
+        try:
+            # Never chmod through a symlink, which would change its target
+            parent = os.path.dirname(failed_path)
+            if not os.path.islink(parent):
+                os.chmod(parent, 0o700)
+            if not os.path.islink(failed_path):
+                os.chmod(failed_path, 0o700)
+            func(failed_path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            failed.append(failed_path)
+    
+    if sys.version_info >= (3, 12):
+        shutil.rmtree(path, onexc=chmod_and_retry)
+    else:
+        shutil.rmtree(path, onerror=chmod_and_retry)
+    
+    if failed:
+        logging.getLogger(__name__).warning(f"Could not delete {len(failed)} entries under {path}, "
+                                            f"e.g. {failed[0]}")
+    return not failed
+
+class BackgroundRemover:
+    """
+    Deletes directory trees on a background thread.
+    
+    A tree is first renamed into a ".trash" directory next to it, which is a
+    single cheap syscall, so its path is free for reuse immediately; the slow
+    recursive delete then happens on one janitor thread.
+    """
+    
+    TRASH_NAME = ".trash"
+    
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.queue: "queue.Queue[str]" = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="janitor", daemon=True)
+        self.thread.start()
+        atexit.register(self.drain)
+    
+    def remove(self, path: str):
+        """
+        Move a directory tree out of the way and schedule its deletion.
+        
+        Falls back to deleting in place if the rename fails.
+        """
+        trash_dir = os.path.join(os.path.dirname(os.path.abspath(path)), self.TRASH_NAME)
+        target = os.path.join(trash_dir, uuid.uuid4().hex)
+        try:
+            os.makedirs(trash_dir, exist_ok=True)
+            os.rename(path, target)
+        except FileNotFoundError:
+            return
+        except OSError:
+            safe_rmtree(path)
+            return
+        self.queue.put(target)
+    
+    def empty_trash(self, directory: str):
+        """Schedule deletion of anything left in a directory's trash (e.g. by a crashed run)."""
+        trash_dir = os.path.join(directory, self.TRASH_NAME)
+        try:
+            with os.scandir(trash_dir) as entries:
+                for entry in entries:
+                    self.queue.put(entry.path)
+        except OSError:
+            pass
+    
+    def drain(self):
+        """Block until every scheduled deletion has finished."""
+        self.queue.join()
+    
+    def _run(self):
+        """Janitor loop: delete queued trees one at a time."""
+        while True:
+            path = self.queue.get()
+            try:
+                safe_rmtree(path)
+            except Exception:
+                # Keep the janitor alive, or drain() would wait forever
+                self.logger.exception(f"Failed to delete {path}")
+            finally:
+                self.queue.task_done()
@@ -0,0 +1,98 @@
+"""
+HTTP response cache for conditional GitHub API requests.
+Stores ETags and response bodies on disk so repeated runs can send
+If-None-Match and reuse cached bodies on 304 Not Modified responses.
+"""
+
+import os
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+from threading import Lock
+from urllib.parse import urlencode
+
+# Import our config (assumes config.py is in parent directory)
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import OUTPUT_CONFIG, get_output_path
+from utils import jsonio
+
+class HTTPCache:
+    """Thread-safe on-disk cache of ETags and JSON response bodies keyed by URL."""
+
+    def __init__(self, index_file: str = None, body_directory: str = None):
+        """
+        Initialize the cache, loading any existing index from disk.
+
+        Args:
+            index_file: JSON file mapping cache keys to ETags and body files
+            body_directory: Directory holding cached response bodies
+        """
+        self.index_file = index_file or get_output_path(OUTPUT_CONFIG["http_cache_file"])
+        self.body_directory = body_directory or get_output_path(OUTPUT_CONFIG["http_cache_directory"])
+        os.makedirs(self.body_directory, exist_ok=True)
+
+        self.lock = Lock()
+        self.logger = logging.getLogger(__name__)
+        self.entries: Dict[str, Dict[str, str]] = self._load_index()
+
+        self.hits = 0  # Responses served from the cache (304s and skipped requests)
+
+    def _load_index(self) -> Dict[str, Dict[str, str]]:
+        """Load the ETag index from disk."""
+        try:
+            return jsonio.load(self.index_file)
+        except (FileNotFoundError, jsonio.JSONDecodeError):
+            return {}
+
+    @staticmethod
+    def cache_key(url: str, params: Optional[Dict] = None) -> str:
+        """Build a stable cache key from a URL and its query parameters."""
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted(params.items()))}"
+
+    def get_etag(self, key: str) -> Optional[str]:
+        """Get the stored ETag for a cache key."""
+        with self.lock:
+            entry = self.entries.get(key)
+            return entry["etag"] if entry else None
+
+    def load_body(self, key: str) -> Optional[Any]:
+        """Load the cached response body for a cache key (None if missing)."""
+        with self.lock:
+            entry = self.entries.get(key)
+
+        if not entry:
+            return None
+
+        try:
+            body = jsonio.load(os.path.join(self.body_directory, entry["body_file"]))
+        except (FileNotFoundError, jsonio.JSONDecodeError):
+            # Body lost or corrupt, forget the ETag so the next request is unconditional
+            with self.lock:
+                self.entries.pop(key, None)
+            return None
+
+        with self.lock:
+            self.hits += 1
+        return body
+
+    def store(self, key: str, etag: str, body: Any):
+        """Store a response body and its ETag."""
+        body_file = hashlib.sha1(key.encode('utf-8')).hexdigest() + ".json"
+
+        jsonio.dump(body, os.path.join(self.body_directory, body_file), indent=False)
+
+        with self.lock:
+            self.entries[key] = {"etag": etag, "body_file": body_file}
+
+    def save(self):
+        """Persist the ETag index to disk."""
+        with self.lock:
+            entries = dict(self.entries)
+
+        jsonio.dump(entries, self.index_file, indent=False, atomic=True)
+
+        self.logger.info(f"HTTP cache saved: {len(entries)} entries, "
+                         f"{self.hits} responses served from cache this run")
@@ -0,0 +1,130 @@
+"""
+JSON file helpers for the scraper pipeline.
+Thin wrapper around orjson, which is considerably faster than the stdlib
+json module and serializes datetimes and dataclasses natively. Large files
+can be streamed item by item with ijson.
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator
+
+import ijson
+import orjson
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError and ValueError
+JSONDecodeError = orjson.JSONDecodeError
+StreamError = ijson.JSONError
+
+def dumps(obj: Any, indent: bool = True) -> bytes:
+    """
+    Serialize an object to JSON bytes.
+
+    Args:
+        obj: Object to serialize (dataclasses and datetimes are supported)
+        indent: Pretty-print with 2-space indentation
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    option = orjson.OPT_SERIALIZE_DATACLASS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, option=option)
+
+def dump(obj: Any, path: str, indent: bool = True, atomic: bool = False):
+    """
+    Serialize an object to a JSON file.
+
+    Args:
+        obj: Object to serialize (dataclasses and datetimes are supported)
+        path: Destination file
+        indent: Pretty-print with 2-space indentation
+        atomic: Write to a temporary file, fsync it and rename it over the
+            destination, so readers never see a half-written file
+    """
+    data = dumps(obj, indent=indent)
+    if not atomic:
+        Path(path).write_bytes(data)
+        return
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def dump_stream(header: Dict[str, Any], list_key: str, items: Iterable[Any], path: str,
+                indent: bool = False):
+    """
+    Write a JSON object whose last member is a list, encoding list items one at a time.
+
+    Produces {**header, list_key: [item, ...]} without materializing the
+    encoded document (or the item dicts) in memory.
+
+    Args:
+        header: Leading members of the object
+        list_key: Name of the list member written last
+        items: Items to encode (dataclasses are supported)
+        path: Destination file
+        indent: Pretty-print each item with 2-space indentation
+    """
+    head = dumps(header, indent=False)[:-1]  # Drop the closing brace
+    with open(path, 'wb') as f:
+        f.write(head)
+        f.write(b',' if header else b'')
+        f.write(orjson.dumps(list_key) + b':[')
+        for i, item in enumerate(items):
+            f.write(b',\n' if i else b'\n')
+            f.write(dumps(item, indent=indent))
+        f.write(b'\n]}')
+
+def append_line(obj: Any, path: str):
+    """Append an object as one compact line to a JSON Lines file."""
+    with open(path, 'ab') as f:
+        f.write(orjson.dumps(obj, option=orjson.OPT_SERIALIZE_DATACLASS | orjson.OPT_APPEND_NEWLINE))
+
+def append_lines(objs: Iterable[Any], path: str):
+    """Append objects as compact lines to a JSON Lines file, in a single write."""
+    option = orjson.OPT_SERIALIZE_DATACLASS | orjson.OPT_APPEND_NEWLINE
+    data = b''.join(orjson.dumps(obj, option=option) for obj in objs)
+    with open(path, 'ab') as f:
+        f.write(data)
+
+def iter_lines(path: str) -> Iterator[Any]:
+    """
+    Parse a JSON Lines file one record at a time.
+
+    Blank and unparseable lines (e.g. a line cut short by a crash) are skipped.
+    """
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+
+def loads(data: Any) -> Any:
+    """Parse JSON from bytes or str."""
+    return orjson.loads(data)
+
+def load(path: str) -> Any:
+    """Parse a JSON file."""
+    return orjson.loads(Path(path).read_bytes())
+
+def iter_items(path: str, prefix: str) -> Iterator[Any]:
+    """
+    Stream the items under a prefix of a JSON file without loading it whole.
+
+    Args:
+        path: JSON file to read
+        prefix: ijson prefix, e.g. "repositories.item"
+
+    Yields:
+        Parsed items, one at a time (floats stay floats, not Decimal)
+    """
+    with open(path, 'rb') as f:
+        yield from ijson.items(f, prefix, use_float=True)
@@ -5,26 +5,122 @@ Handles GitHub API rate limiting and general request throttling.
 
 import time
 import logging
-from typing import Optional, Dict, Any
+from collections import deque
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
 from dataclasses import dataclass
-from threading import Lock
-from datetime import datetime, timedelta
+from threading import Event, Lock, local
+from datetime import datetime
 
-@dataclass
+# Window lengths in integer nanoseconds, for comparison with time.monotonic_ns()
+_NS_PER_SECOND = 1_000_000_000
+_MINUTE_NS = 60 * _NS_PER_SECOND
+
+# GitHub's primary rate limit window, and the longest single back-off sleep
+_WINDOW_SECONDS = 3600
+_MAX_SLEEP_SECONDS = 300
+_MAX_BACKOFF_STEPS = 31
+
+# GitHub rate limit response headers
+HEADER_LIMIT = 'X-RateLimit-Limit'
+HEADER_REMAINING = 'X-RateLimit-Remaining'
+HEADER_RESET = 'X-RateLimit-Reset'
+HEADER_USED = 'X-RateLimit-Used'
+HEADER_RESOURCE = 'X-RateLimit-Resource'
+
+# Conditional request answered from the client's cache; not billed by GitHub
+HTTP_NOT_MODIFIED = 304
+
+@dataclass(frozen=True)
 class RateLimitInfo:
-    """Rate limit information from API headers."""
+    """Rate limit information from API headers (immutable)."""
+    __slots__ = ("limit", "remaining", "reset_time", "used")
+    
     limit: int
     remaining: int
     reset_time: int
     used: int
 
+class RateLimiterCancelled(Exception):
+    """Raised when a rate limiter wait is cut short by RateLimiter.cancel()."""
+    pass
+
+class RateLimiterTicket:
+    """
+    One request's passage through a rate limiter, as a context manager.
+    
+    Entering waits for a slot; set `response` inside the block and its
+    headers are recorded on exit:
+    
+        with limiter.acquire() as ticket:
+            ticket.response = session.get(url)
+    """
+    
+    __slots__ = ("limiter", "wait", "response")
+    
+    def __init__(self, limiter: "RateLimiter", wait: Callable[[], bool]):
+        self.limiter = limiter
+        self.wait = wait
+        self.response = None
+    
+    def __enter__(self) -> "RateLimiterTicket":
+        if not self.wait():
+            raise RateLimiterCancelled("Rate limiter cancelled")
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.response is not None:
+            self.limiter.record_request(self.response.headers, self.response.status_code)
+
+class ShardedCounter:
+    """
+    Counter that each thread increments in its own cell, summed on read.
+    
+    Increments never touch a shared lock; only a thread's first increment
+    registers its cell.
+    """
+    
+    __slots__ = ("cells", "local", "lock")
+    
+    def __init__(self):
+        self.cells = []
+        self.local = local()
+        self.lock = Lock()
+    
+    def increment(self):
+        """Add one to the calling thread's cell."""
+        try:
+            cell = self.local.cell
+        except AttributeError:
+            cell = self.local.cell = [0]
+            with self.lock:
+                self.cells.append(cell)
+        cell[0] += 1
+    
+    @property
+    def value(self) -> int:
+        """Sum of all cells (may miss increments racing with the read)."""
+        return sum(cell[0] for cell in self.cells)
+
 class RateLimiter:
     """Thread-safe rate limiter for API requests."""
     
+    # Slotted: attributes are read on every request
+    __slots__ = (
+        "requests_per_hour", "buffer_percentage", "effective_limit", "rate",
+        "bucket", "lock", "cancelled", "logger",
+        "log_debug", "log_warning",
+    )
+    
     def __init__(self, requests_per_hour: int = 5000, buffer_percentage: float = 0.1):
         """
         Initialize rate limiter.
         
+        Requests are paced with a token bucket: it holds up to an hour's
+        budget and refills continuously at effective_limit per hour, so once
+        a burst is spent requests are spaced evenly instead of stalling until
+        an hourly window resets.
+        
         Args:
             requests_per_hour: Maximum requests allowed per hour
             buffer_percentage: Safety buffer (e.g., 0.1 = use only 90% of limit)
@@ -33,95 +129,146 @@ class RateLimiter:
         self.buffer_percentage = buffer_percentage
         self.effective_limit = int(requests_per_hour * (1 - buffer_percentage))
         
-        self.requests_made = 0
-        self.window_start = time.time()
+        # Refill rate in tokens per second. The bucket is refilled from the
+        # monotonic clock (integer ns) so wall clock jumps can't disturb it;
+        # reset times reported by GitHub are epoch seconds and compared to time.time()
+        self.rate = self.effective_limit / _WINDOW_SECONDS
+        # (tokens, last refill time in ns), replaced as a whole so lock-free
+        # readers always see a matching pair
+        self.bucket = (float(self.effective_limit), time.monotonic_ns())
         self.lock = Lock()
         
+        # Set by cancel() to cut every current and future wait short
+        self.cancelled = Event()
+        
         self.logger = logging.getLogger(__name__)
+        self.refresh_log_levels()
+        
+        self.logger.info("Rate limiter initialized: %d requests/hour (original: %d, buffer: %.1f%%)",
+                         self.effective_limit, requests_per_hour, buffer_percentage * 100)
+    
+    def refresh_log_levels(self):
+        """Re-read the logger's enabled levels (call after changing logging configuration)."""
+        self.log_debug = self.logger.isEnabledFor(logging.DEBUG)
+        self.log_warning = self.logger.isEnabledFor(logging.WARNING)
+    
+    def cancel(self):
+        """Wake all threads waiting in the limiter and stop further waits (e.g. on Ctrl-C)."""
+        self.cancelled.set()
+    
+    def sleep(self, seconds: float) -> bool:
+        """
+        Sleep unless the limiter is cancelled.
+        
+        Returns:
+            True if the full time elapsed, False if cancelled
+        """
+        return not self.cancelled.wait(seconds)
+    
+    def _refill(self) -> Tuple[float, int]:
+        """
+        Count the tokens accrued since the last refill (call with the lock held).
         
-        self.logger.info(f"Rate limiter initialized: {self.effective_limit} requests/hour "
-                        f"(original: {requests_per_hour}, buffer: {buffer_percentage:.1%})")
+        Returns:
+            Tokens in the bucket now, and the monotonic time (ns) they were counted at
+        """
+        now_ns = time.monotonic_ns()
+        tokens, last_refill_ns = self.bucket
+        tokens += (now_ns - last_refill_ns) * self.rate / _NS_PER_SECOND
+        limit = self.effective_limit
+        if tokens > limit:
+            tokens = limit
+        return tokens, now_ns
     
     def wait_if_needed(self) -> bool:
         """
-        Check if we need to wait due to rate limiting.
+        Take a token for a request, waiting until one is available.
+        
+        The token is taken under the lock even when none is left (the bucket
+        goes into debt), so waiting threads queue up one refill interval apart
+        and sleep without holding the lock.
         
         Returns:
-            True if request can proceed, False if permanently rate limited
+            True if request can proceed, False if the limiter was cancelled
         """
         with self.lock:
-            current_time = time.time()
-            
-            # Reset window if an hour has passed
-            if current_time - self.window_start >= 3600:
-                self.requests_made = 0
-                self.window_start = current_time
-                self.logger.debug("Rate limit window reset")
-            
-            # Check if we're at the limit
-            if self.requests_made >= self.effective_limit:
-                time_until_reset = 3600 - (current_time - self.window_start)
-                
-                if time_until_reset > 0:
-                    self.logger.warning(f"Rate limit reached ({self.requests_made}/{self.effective_limit}). "
-                                      f"Sleeping for {time_until_reset:.0f} seconds")
-                    time.sleep(time_until_reset)
-                    
-                    # Reset after sleeping
-                    self.requests_made = 0
-                    self.window_start = time.time()
-                
-            return True
+            tokens, now_ns = self._refill()
+            self.bucket = (tokens - 1, now_ns)
+        
+        if tokens >= 1:
+            return not self.cancelled.is_set()
+        
+        sleep_time = (1 - tokens) / self.rate
+        if sleep_time >= 60:
+            self.logger.warning("Rate limit budget exhausted. Sleeping for %.0f seconds", sleep_time)
+        return self.sleep(sleep_time)
+    
+    def acquire(self) -> RateLimiterTicket:
+        """Wait for a request slot and record the response, in one with-statement (see RateLimiterTicket)."""
+        return RateLimiterTicket(self, self.wait_if_needed)
     
-    def record_request(self, response_headers: Optional[Dict[str, str]] = None) -> Optional[RateLimitInfo]:
+    def record_request(self, response_headers: Optional[Dict[str, str]] = None,
+                       status_code: Optional[int] = None) -> Optional[RateLimitInfo]:
         """
-        Record that a request was made and update rate limit info from headers.
+        Update rate limit info from a response's headers.
+        
+        The request itself was already accounted for by wait_if_needed; a 304
+        Not Modified answer to a conditional request is free on GitHub, so its
+        token is given back.
         
         Args:
             response_headers: HTTP response headers containing rate limit info
+            status_code: HTTP status of the response, if known
             
         Returns:
             RateLimitInfo if headers contained rate limit data
         """
-        with self.lock:
-            self.requests_made += 1
-            
-            rate_limit_info = None
-            
-            # Parse GitHub rate limit headers if available
-            if response_headers:
-                rate_limit_info = self._parse_github_headers(response_headers)
-                
-                if rate_limit_info:
-                    # Update our internal tracking based on API response
-                    self._update_from_api(rate_limit_info)
-            
-            self.logger.debug(f"Request recorded. Total in window: {self.requests_made}")
+        # Parse GitHub rate limit headers if available
+        rate_limit_info = self._parse_github_headers(response_headers) if response_headers else None
+        not_modified = status_code == HTTP_NOT_MODIFIED
+        if not (rate_limit_info or not_modified):
             return rate_limit_info
+        
+        sleep_time = 0.0
+        with self.lock:
+            if not_modified:
+                tokens, now_ns = self._refill()
+                self.bucket = (min(tokens + 1, self.effective_limit), now_ns)
+            if rate_limit_info:
+                # Update our internal tracking based on API response
+                sleep_time = self._update_from_api(rate_limit_info)
+        # Sleep after releasing the lock, so other threads aren't pinned behind this one
+        if sleep_time:
+            self.sleep(sleep_time)
+        return rate_limit_info
     
     def _parse_github_headers(self, headers: Dict[str, str]) -> Optional[RateLimitInfo]:
-        """Parse GitHub API rate limit headers."""
+        """Parse GitHub API rate limit headers, or None if any required one is missing."""
+        limit = headers.get(HEADER_LIMIT)
+        if limit is None:
+            return None
+        remaining = headers.get(HEADER_REMAINING)
+        if remaining is None:
+            return None
+        reset_time = headers.get(HEADER_RESET)
+        if reset_time is None:
+            return None
+        used = headers.get(HEADER_USED)
+        
         try:
-            # GitHub uses these headers for rate limiting
-            limit = headers.get('X-RateLimit-Limit')
-            remaining = headers.get('X-RateLimit-Remaining') 
-            reset_time = headers.get('X-RateLimit-Reset')
-            used = headers.get('X-RateLimit-Used')
-            
-            if all(v is not None for v in [limit, remaining, reset_time]):
-                return RateLimitInfo(
-                    limit=int(limit),
-                    remaining=int(remaining),
-                    reset_time=int(reset_time),
-                    used=int(used) if used else int(limit) - int(remaining)
-                )
-        except (ValueError, TypeError) as e:
-            self.logger.warning(f"Failed to parse rate limit headers: {e}")
-            
-        return None
+            limit, remaining, reset_time = int(limit), int(remaining), int(reset_time)
+            return RateLimitInfo(limit, remaining, reset_time, int(used) if used else limit - remaining)
+        except ValueError as e:
+            self.logger.warning("Failed to parse rate limit headers: %s", e)
+            return None
     
-    def _update_from_api(self, rate_limit_info: RateLimitInfo):
-        """Update internal rate limiting based on API response."""
+    def _update_from_api(self, rate_limit_info: RateLimitInfo) -> float:
+        """
+        Update internal rate limiting based on API response (call with the lock held).
+        
+        Returns:
+            Seconds the caller should sleep once it has released the lock (0 for none)
+        """
         current_time = time.time()
         
         # If API reset time is in the future, align our window
@@ -129,38 +276,49 @@ class RateLimiter:
             time_to_reset = rate_limit_info.reset_time - current_time
             
             # If it's more than an hour in the future, something's wrong
-            if time_to_reset <= 3600:
-                # Adjust our request count based on API info
-                self.requests_made = rate_limit_info.used
+            if time_to_reset <= _WINDOW_SECONDS:
+                # Never hold more tokens than GitHub says are left. Clamping to
+                # effective_limit - used instead would run deep into debt whenever
+                # the remainder is within the buffer, ignoring the coming reset.
+                tokens, now_ns = self._refill()
+                self.bucket = (min(tokens, rate_limit_info.remaining), now_ns)
                 
                 # If we're close to the limit, be more conservative
                 if rate_limit_info.remaining < 100:
-                    self.logger.warning(f"API rate limit low: {rate_limit_info.remaining} remaining")
+                    if self.log_warning:
+                        self.logger.warning("API rate limit low: %d remaining", rate_limit_info.remaining)
                     
                     # If very close to limit, wait until reset
                     if rate_limit_info.remaining < 10:
-                        sleep_time = min(time_to_reset, 300)  # Max 5 minute wait
-                        self.logger.warning(f"Very close to rate limit, sleeping {sleep_time:.0f}s")
-                        time.sleep(sleep_time)
+                        sleep_time = min(time_to_reset, _MAX_SLEEP_SECONDS)
+                        if self.log_warning:
+                            self.logger.warning("Very close to rate limit, sleeping %.0fs", sleep_time)
+                        return sleep_time
+        return 0.0
     
     def get_status(self) -> Dict[str, Any]:
-        """Get current rate limiter status."""
-        with self.lock:
-            current_time = time.time()
-            window_elapsed = current_time - self.window_start
-            
-            return {
-                "requests_made": self.requests_made,
-                "effective_limit": self.effective_limit,
-                "window_elapsed_seconds": window_elapsed,
-                "requests_remaining": max(0, self.effective_limit - self.requests_made),
-                "time_until_reset": max(0, 3600 - window_elapsed),
-                "current_rate": self.requests_made / max(window_elapsed / 3600, 0.001)  # requests/hour
-            }
+        """Get current rate limiter status (a lock-free snapshot, so it never stalls requests)."""
+        limit, rate = self.effective_limit, self.rate
+        tokens, last_refill_ns = self.bucket
+        elapsed = (time.monotonic_ns() - last_refill_ns) / _NS_PER_SECOND
+        tokens = min(limit, tokens + elapsed * rate)
+        
+        return {
+            "tokens": tokens,
+            "effective_limit": limit,
+            "requests_remaining": max(0, int(tokens)),
+            "time_until_full": (limit - tokens) / rate,
+            "refill_rate": limit,  # requests/hour
+        }
 
 class AdaptiveRateLimiter(RateLimiter):
     """Rate limiter that adapts based on server responses."""
     
+    __slots__ = (
+        "consecutive_429s", "adaptive_delay", "min_delay", "max_delay",
+        "success_counter", "error_count", "backoff_delays",
+    )
+    
     def __init__(self, initial_requests_per_hour: int = 5000, **kwargs):
         super().__init__(initial_requests_per_hour, **kwargs)
         
@@ -168,8 +326,11 @@ class AdaptiveRateLimiter(RateLimiter):
         self.adaptive_delay = 0.0  # Additional delay between requests
         self.min_delay = 0.1  # Minimum delay between requests
         self.max_delay = 10.0  # Maximum adaptive delay
+        # Exponential backoff delays indexed by consecutive 429 count
+        self.backoff_delays = tuple(min(self.max_delay, self.min_delay * (1 << i))
+                                    for i in range(_MAX_BACKOFF_STEPS + 1))
         
-        self.success_count = 0  # Count successful requests
+        self.success_counter = ShardedCounter()  # Count successful requests
         self.error_count = 0   # Count failed requests
         
     def handle_429_response(self, retry_after: Optional[int] = None):
@@ -178,146 +339,259 @@ class AdaptiveRateLimiter(RateLimiter):
             self.consecutive_429s += 1
             self.error_count += 1
             
+            consecutive_429s = self.consecutive_429s
             # Exponential backoff for adaptive delay
-            self.adaptive_delay = min(
-                self.max_delay,
-                self.min_delay * (2 ** self.consecutive_429s)
-            )
-            
-            self.logger.warning(f"Rate limited (429). Consecutive: {self.consecutive_429s}, "
-                              f"adaptive delay now: {self.adaptive_delay:.1f}s")
-            
-            # If server provided retry-after header, respect it
-            if retry_after:
-                sleep_time = min(retry_after, 300)  # Max 5 minutes
-                self.logger.info(f"Server requested retry after {retry_after}s, sleeping {sleep_time}s")
-                time.sleep(sleep_time)
+            adaptive_delay = self.backoff_delays[min(consecutive_429s, _MAX_BACKOFF_STEPS)]
+            self.adaptive_delay = adaptive_delay
+        
+        self.logger.warning("Rate limited (429). Consecutive: %d, adaptive delay now: %.1fs",
+                            consecutive_429s, adaptive_delay)
+        
+        # If server provided retry-after header, respect it (sleeping without the lock)
+        if retry_after:
+            sleep_time = min(retry_after, _MAX_SLEEP_SECONDS)
+            self.logger.info("Server requested retry after %ds, sleeping %ds", retry_after, sleep_time)
+            self.sleep(sleep_time)
     
     def handle_success_response(self):
         """Handle successful response - reduce adaptive delay."""
+        self.success_counter.increment()
+        # Nothing to back off from: skip the lock (rechecked under it below)
+        if self.consecutive_429s == 0:
+            return
+        
         with self.lock:
-            self.success_count += 1
-            
             # Reset consecutive errors and reduce adaptive delay
-            if self.consecutive_429s > 0:
-                self.consecutive_429s = max(0, self.consecutive_429s - 1)
-                
-                # Gradually reduce adaptive delay
-                self.adaptive_delay = max(
-                    self.min_delay,
-                    self.adaptive_delay * 0.8
-                )
-                
-                self.logger.debug(f"Success response, adaptive delay reduced to: {self.adaptive_delay:.1f}s")
+            if self.consecutive_429s == 0:
+                return
+            self.consecutive_429s = max(0, self.consecutive_429s - 1)
+            
+            # Gradually reduce adaptive delay
+            self.adaptive_delay = adaptive_delay = max(
+                self.min_delay,
+                self.adaptive_delay * 0.8
+            )
+        
+        if self.log_debug:
+            self.logger.debug("Success response, adaptive delay reduced to: %.1fs", adaptive_delay)
     
     def wait_if_needed(self) -> bool:
-        """Enhanced wait logic with adaptive delays."""
-        # First check standard rate limiting
-        if not super().wait_if_needed():
-            return False
+        """
+        Enhanced wait logic with adaptive delays.
+        
+        Takes a token and reads the adaptive delay in one critical section,
+        then sleeps once for the token wait plus the delay.
+        """
+        with self.lock:
+            tokens, now_ns = self._refill()
+            self.bucket = (tokens - 1, now_ns)
+            adaptive_delay = self.adaptive_delay
         
-        # Then apply adaptive delay if needed
-        if self.adaptive_delay > self.min_delay:
-            self.logger.debug(f"Applying adaptive delay: {self.adaptive_delay:.1f}s")
-            time.sleep(self.adaptive_delay)
+        sleep_time = (1 - tokens) / self.rate if tokens < 1 else 0.0
+        if sleep_time >= 60:
+            self.logger.warning("Rate limit budget exhausted. Sleeping for %.0f seconds", sleep_time)
+        
+        if adaptive_delay > self.min_delay:
+            if self.log_debug:
+                self.logger.debug("Applying adaptive delay: %.1fs", adaptive_delay)
+            sleep_time += adaptive_delay
         else:
             # Always have minimum delay to be respectful
-            time.sleep(self.min_delay)
+            sleep_time += self.min_delay
         
-        return True
+        if sleep_time > 0:
+            return self.sleep(sleep_time)
+        return not self.cancelled.is_set()
     
     def get_status(self) -> Dict[str, Any]:
         """Get enhanced status including adaptive information."""
         status = super().get_status()
+        success_count = self.success_counter.value
         status.update({
             "consecutive_429s": self.consecutive_429s,
             "adaptive_delay": self.adaptive_delay,
-            "success_count": self.success_count,
+            "success_count": success_count,
             "error_count": self.error_count,
-            "success_rate": self.success_count / max(1, self.success_count + self.error_count)
+            "success_rate": success_count / max(1, success_count + self.error_count)
         })
         return status
 
 class GitHubRateLimiter(AdaptiveRateLimiter):
     """Specialized rate limiter for GitHub API."""
     
+    __slots__ = (
+        "token_provided", "resource_limits", "search_times", "search_limit",
+        "pacing_threshold", "next_slot_ns",
+    )
+    
     def __init__(self, token_provided: bool = False):
         # GitHub limits: 5000/hour with token, 60/hour without
         requests_per_hour = 5000 if token_provided else 60
         super().__init__(requests_per_hour, buffer_percentage=0.1)
         
         self.token_provided = token_provided
-        self.core_limit_info: Optional[RateLimitInfo] = None
-        self.search_limit_info: Optional[RateLimitInfo] = None
+        # Last budget GitHub reported per resource ("core", "search", "graphql", ...);
+        # each resource is accounted separately by GitHub
+        self.resource_limits: Dict[str, RateLimitInfo] = {}
         
         # GitHub has separate limits for different API endpoints
-        self.search_requests_made = 0
-        self.search_window_start = time.time()
+        self.search_times: Deque[int] = deque()  # monotonic_ns of search requests in the last minute
         self.search_limit = 30 if token_provided else 10  # Search API has lower limits
         
-    def wait_for_search_api(self) -> bool:
-        """Special handling for GitHub search API which has lower limits."""
+        # Start pacing requests once the remaining budget drops below this fraction
+        self.pacing_threshold = 0.1
+        # Per resource, the monotonic_ns at which the next paced request may go out
+        self.next_slot_ns: Dict[str, int] = {}
+        
+    @property
+    def core_limit_info(self) -> Optional[RateLimitInfo]:
+        """Last reported core API budget."""
+        return self.resource_limits.get("core")
+    
+    @property
+    def search_limit_info(self) -> Optional[RateLimitInfo]:
+        """Last reported search API budget."""
+        return self.resource_limits.get("search")
+    
+    def record_request(self, response_headers: Optional[Dict[str, str]] = None,
+                       status_code: Optional[int] = None) -> Optional[RateLimitInfo]:
+        """
+        Record a request and remember the budget GitHub reported for its resource.
+        
+        Only core requests are reconciled with the local token bucket (and get
+        their token back on a 304); other resources (search, graphql) have
+        their own budgets and are tracked purely from the X-RateLimit-* headers.
+        """
+        resource = response_headers.get(HEADER_RESOURCE, 'core') if response_headers else 'core'
+        
+        if resource == 'core':
+            rate_limit_info = super().record_request(response_headers, status_code)
+        else:
+            # Parsing touches no shared state
+            rate_limit_info = self._parse_github_headers(response_headers)
+        
+        if rate_limit_info:
+            with self.lock:
+                self.resource_limits[resource] = rate_limit_info
+        
+        return rate_limit_info
+    
+    def update_from_rate_limit(self, resources: Dict[str, Dict[str, int]]):
+        """
+        Seed limiter state from a GitHub /rate_limit response.
+        
+        Args:
+            resources: The "resources" object of the /rate_limit response
+        """
+        with self.lock:
+            for resource, data in resources.items():
+                self.resource_limits[resource] = RateLimitInfo(
+                    limit=data["limit"],
+                    remaining=data["remaining"],
+                    reset_time=data["reset"],
+                    used=data.get("used", data["limit"] - data["remaining"])
+                )
+            
+            if self.core_limit_info:
+                tokens, now_ns = self._refill()
+                self.bucket = (min(tokens, self.core_limit_info.remaining), now_ns)
+        
+        if self.core_limit_info:
+            self.logger.info("GitHub API budget: %d/%d requests remaining, resets at %s",
+                             self.core_limit_info.remaining, self.core_limit_info.limit,
+                             datetime.fromtimestamp(self.core_limit_info.reset_time).isoformat())
+    
+    def acquire(self, resource: str = "core") -> RateLimiterTicket:
+        """Wait for a slot for a request against a GitHub resource and record its response."""
+        return RateLimiterTicket(self, partial(self.wait_for_slot, resource))
+    
+    def wait_for_slot(self, resource: str = "core") -> bool:
+        """
+        Wait before an API request, pacing from the last budget GitHub reported for its resource.
+        
+        While plenty of budget remains requests go out immediately; below
+        `pacing_threshold` the remaining requests are spread evenly over the
+        time left until the reset. Paced slots are handed out one interval
+        apart under the lock, so concurrent callers queue up instead of all
+        sleeping the same interval and firing together.
+        
+        Core requests always take a token from the bucket as well (clamped to
+        the reported budget by record_request), and search requests always
+        pass the sliding search window, so they stay evenly spaced whatever
+        the reported budget; pacing only ever lengthens the wait.
+        
+        Args:
+            resource: GitHub rate limit resource the request counts against
+            
+        Returns:
+            True if request can proceed, False if the limiter was cancelled
+        """
         with self.lock:
-            current_time = time.time()
+            info = self.resource_limits.get(resource)
+            adaptive_delay = self.adaptive_delay
+            delay = adaptive_delay if adaptive_delay > self.min_delay else 0.0
             
-            # Reset search window (1 minute for search API)
-            if current_time - self.search_window_start >= 60:
-                self.search_requests_made = 0
-                self.search_window_start = current_time
+            if resource == "core":
+                tokens, now_ns = self._refill()
+                self.bucket = (tokens - 1, now_ns)
+                if tokens < 1:
+                    delay = max(delay, (1 - tokens) / self.rate)
             
-            # Check search API limit
-            if self.search_requests_made >= self.search_limit:
-                time_until_reset = 60 - (current_time - self.search_window_start)
+            if info is not None and info.remaining < info.limit * self.pacing_threshold:
+                now_ns = time.monotonic_ns()
+                time_until_reset = max(0.0, info.reset_time - time.time())
+                interval_ns = int(time_until_reset / max(1, info.remaining) * _NS_PER_SECOND)
+                slot_ns = max(now_ns, self.next_slot_ns.get(resource, 0))
+                self.next_slot_ns[resource] = slot_ns + interval_ns
+                delay = max(delay, (slot_ns - now_ns) / _NS_PER_SECOND)
+        
+        # The search window always applies, so parallel result pages can't burst
+        if resource == "search" and not self.wait_for_search_api():
+            return False
+        
+        if delay > 0:
+            if delay >= 60:
+                self.logger.warning("Rate limit budget exhausted. Sleeping for %.0f seconds", delay)
+            elif self.log_debug:
+                self.logger.debug("Pacing request for %.2fs", delay)
+            return self.sleep(delay)
+        
+        return not self.cancelled.is_set()
+        
+    def wait_for_search_api(self) -> bool:
+        """
+        Special handling for GitHub search API which has lower limits.
+        
+        A sliding one-minute window: a request is admitted once fewer than
+        search_limit requests were made in the last minute, so waiting threads
+        are released one by one as old requests age out rather than all at once.
+        
+        Returns:
+            True if request can proceed, False if the limiter was cancelled
+        """
+        while True:
+            with self.lock:
+                now_ns = time.monotonic_ns()
+                search_times = self.search_times
+                while search_times and now_ns - search_times[0] >= _MINUTE_NS:
+                    search_times.popleft()
                 
-                if time_until_reset > 0:
-                    self.logger.warning(f"Search API rate limit reached. "
-                                      f"Sleeping for {time_until_reset:.0f} seconds")
-                    time.sleep(time_until_reset)
-                    self.search_requests_made = 0
-                    self.search_window_start = time.time()
+                if len(search_times) < self.search_limit:
+                    search_times.append(now_ns)
+                    return not self.cancelled.is_set()
+                
+                sleep_time = (_MINUTE_NS - (now_ns - search_times[0])) / _NS_PER_SECOND
             
-            self.search_requests_made += 1
-            return True
+            self.logger.warning("Search API rate limit reached. Sleeping for %.0f seconds", sleep_time)
+            if not self.sleep(sleep_time):
+                return False
     
     def record_search_request(self, response_headers: Optional[Dict[str, str]] = None):
         """Record a search API request."""
-        self.record_request(response_headers)
-        
-        # Parse search-specific rate limit headers
-        if response_headers:
-            search_limit = response_headers.get('X-RateLimit-Limit')
-            search_remaining = response_headers.get('X-RateLimit-Remaining')
-            
-            if search_limit and search_remaining:
-                self.logger.debug(f"Search API: {search_remaining}/{search_limit} remaining")
+        rate_limit_info = self.record_request(response_headers)
+        if rate_limit_info and self.log_debug:
+            self.logger.debug("Search API: %d/%d remaining", rate_limit_info.remaining, rate_limit_info.limit)
 
 def create_github_rate_limiter(token_provided: bool = False) -> GitHubRateLimiter:
     """Factory function to create appropriate GitHub rate limiter."""
     return GitHubRateLimiter(token_provided)
-
-def main():
-    """Test rate limiter functionality."""
-    logging.basicConfig(level=logging.DEBUG)
-    
-    # Test basic rate limiter
-    limiter = RateLimiter(requests_per_hour=10)  # Very low for testing
-    
-    print("Testing rate limiter...")
-    for i in range(15):
-        print(f"Request {i+1}: ", end="")
-        
-        start_time = time.time()
-        limiter.wait_if_needed()
-        limiter.record_request()
-        elapsed = time.time() - start_time
-        
-        print(f"took {elapsed:.1f}s")
-        
-        # Show status every few requests
-        if (i + 1) % 5 == 0:
-            status = limiter.get_status()
-            print(f"Status: {status['requests_made']}/{status['effective_limit']} requests, "
-                  f"{status['requests_remaining']} remaining")
-
-if __name__ == "__main__":
-    main()
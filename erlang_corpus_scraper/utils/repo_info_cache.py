@@ -0,0 +1,85 @@
+"""
+On-disk cache of raw repository metadata for the GitHub discovery phase.
+Entries are keyed by repository name and validated against the repository's
+updated_at timestamp (known from search results), so an unchanged repository
+needs no API request at all on later runs.
+"""
+
+import os
+import hashlib
+import logging
+from typing import Dict, Optional, Tuple
+from threading import Lock
+
+# Import our config (assumes config.py is in parent directory)
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import OUTPUT_CONFIG, get_output_path
+from utils import jsonio
+
+class RepositoryInfoCache:
+    """Thread-safe disk cache of (repository data, languages data) per repository."""
+
+    def __init__(self, directory: str = None):
+        """
+        Initialize the cache.
+
+        Args:
+            directory: Directory holding one JSON file per repository
+        """
+        self.directory = directory or get_output_path(OUTPUT_CONFIG["repo_info_cache_directory"])
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.lock = Lock()
+        self.logger = logging.getLogger(__name__)
+        self.memory: Dict[str, dict] = {}  # In-process copy of entries read or written this run
+
+        self.hits = 0
+
+    def _path(self, full_name: str) -> str:
+        """Get the cache file for a repository."""
+        digest = hashlib.sha1(full_name.casefold().encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get(self, full_name: str, updated_at: str) -> Optional[Tuple[Dict, Dict]]:
+        """
+        Get cached metadata if the repository has not been updated since it was cached.
+
+        Args:
+            full_name: Repository full name ("owner/name")
+            updated_at: Current updated_at timestamp of the repository
+
+        Returns:
+            (repository data, languages data) or None on a miss or stale entry
+        """
+        key = full_name.casefold()
+        with self.lock:
+            entry = self.memory.get(key)
+
+        if entry is None:
+            try:
+                entry = jsonio.load(self._path(full_name))
+            except (FileNotFoundError, jsonio.JSONDecodeError):
+                return None
+            with self.lock:
+                self.memory[key] = entry
+
+        if entry.get("updated_at") != updated_at:
+            return None
+
+        with self.lock:
+            self.hits += 1
+        return entry["repo"], entry["languages"]
+
+    def put(self, repo_data: Dict, languages_data: Dict):
+        """Store metadata for a repository, keyed by its full name and updated_at."""
+        full_name = repo_data["full_name"]
+        entry = {
+            "updated_at": repo_data.get("updated_at"),
+            "repo": repo_data,
+            "languages": languages_data,
+        }
+        jsonio.dump(entry, self._path(full_name), indent=False)
+
+        with self.lock:
+            self.memory[full_name.casefold()] = entry